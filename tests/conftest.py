@@ -0,0 +1,91 @@
+import json
+import os
+import sys
+import textwrap
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Stands in for west.app.main in worker and server tests, so they don't need west.
+FAKE_WEST_MAIN = '''
+import json
+import os
+import subprocess
+import sys
+import time
+
+def main(argv):
+    if os.environ.get('FAKE_WEST_LOG'):
+        with open(os.environ['FAKE_WEST_LOG'], 'a') as f:
+            f.write(json.dumps(argv) + '\\n')
+    command = argv[0]
+    if command == 'pid':
+        print(os.getpid())
+    elif command == 'echo':
+        print(' '.join(argv[1:]))
+        print('to stderr', file=sys.stderr)
+    elif command == 'child':
+        # Written by a child process, straight to the inherited fds.
+        subprocess.run([sys.executable, '-c', 'import os; os.write(1, b"from child\\\\n")'])
+    elif command == 'bytes':
+        sys.stdout.flush()
+        os.write(1, b'\\xff\\xfeok\\n')
+    elif command == 'stdin':
+        print(repr(sys.stdin.read()))
+    elif command == 'slow':
+        time.sleep(float(argv[1]))
+        print('slow done')
+    elif command == 'boards':
+        print(time.time_ns())
+        if argv[1:] == ['fail']:
+            sys.exit(3)
+    elif command == 'update':
+        time.sleep(float(argv[1]) if argv[1:] else 0)
+    elif command == 'fail':
+        sys.exit(3)
+    elif command == 'message':
+        sys.exit('fatal: something went wrong')
+    elif command == 'raise':
+        raise RuntimeError('boom')
+'''
+
+
+@pytest.fixture
+def fake_west(tmp_path, monkeypatch):
+    """Puts a fake 'west' package first on PYTHONPATH; returns its directory."""
+    app = tmp_path / 'west' / 'app'
+    app.mkdir(parents=True)
+    (tmp_path / 'west' / '__init__.py').write_text('')
+    (app / '__init__.py').write_text('')
+    (app / 'main.py').write_text(textwrap.dedent(FAKE_WEST_MAIN))
+    monkeypatch.setenv('PYTHONPATH', str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture
+def west_bin(fake_west, monkeypatch):
+    """
+    Makes the server run the fake west as a 'west' script, without workers,
+    memoized results or the disk cache. Returns a function that lists the
+    argv of every command run so far.
+    """
+    script = fake_west / 'bin' / 'west'
+    script.parent.mkdir()
+    script.write_text(f"#!{sys.executable}\nimport sys\nfrom west.app.main import main\nmain(sys.argv[1:])\n")
+    script.chmod(0o755)
+    log = fake_west / 'log'
+    monkeypatch.setenv('FAKE_WEST_LOG', str(log))
+    monkeypatch.delenv('ZEPHYR_BASE', raising=False)
+    monkeypatch.chdir(fake_west)
+    import west_mcp_server as server
+    monkeypatch.setattr(server, '_WEST_BIN', str(script))
+    monkeypatch.setattr(server, '_west_workers', server._WestWorkerPool(0))
+    monkeypatch.setattr(server, '_west_memo', server.collections.OrderedDict())
+    monkeypatch.setattr(server, '_USE_DISK_CACHE', False)
+    monkeypatch.setattr(server, '_topdir_cache', {})
+
+    def runs():
+        return [json.loads(line) for line in log.read_text().splitlines()] if log.exists() else []
+    return runs
@@ -0,0 +1,66 @@
+import asyncio
+
+import west_mcp_server as server
+
+
+def update(*args, tail_lines=None):
+    return asyncio.ensure_future(server.run_west_command(['update', *args], tail_lines=tail_lines))
+
+
+async def started(west_bin, count):
+    while len(west_bin()) < count:
+        await asyncio.sleep(0.02)
+
+
+def test_identical_commands_share_one_run(west_bin):
+    async def main():
+        results = await asyncio.gather(*(update('0.3') for _ in range(3)))
+        assert all(result.success for result in results)
+        assert results[1] is results[0] and results[2] is results[0]
+        assert not server._inflight
+
+    asyncio.run(main())
+    assert west_bin() == [['update', '0.3']]
+
+
+def test_different_commands_run_separately(west_bin):
+    async def main():
+        await asyncio.gather(update('0.2'), update('0.2', tail_lines=5), update('0.1'))
+
+    asyncio.run(main())
+    assert sorted(west_bin()) == [['update', '0.1'], ['update', '0.2'], ['update', '0.2']]
+
+
+def test_finished_commands_are_not_joined(west_bin):
+    async def main():
+        await update('0')
+        await update('0')
+
+    asyncio.run(main())
+    assert west_bin() == [['update', '0']] * 2
+
+
+def test_cancelled_caller_leaves_the_run_to_the_others(west_bin):
+    async def main():
+        first, second, third = update('0.5'), update('0.5'), update('0.5')
+        await started(west_bin, 1)
+        first.cancel()
+        results = await asyncio.gather(second, third)
+        assert first.cancelled()
+        assert results[0].success and results[1] is results[0]
+
+    asyncio.run(main())
+    assert west_bin() == [['update', '0.5']]
+
+
+def test_run_finishes_when_its_only_caller_is_cancelled(west_bin):
+    async def main():
+        caller = update('0.3')
+        await started(west_bin, 1)
+        run, = server._inflight.values()
+        caller.cancel()
+        assert (await run).success
+        assert caller.cancelled()
+        assert not server._inflight
+
+    asyncio.run(main())
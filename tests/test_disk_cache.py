@@ -0,0 +1,54 @@
+import os
+
+import pytest
+
+import west_mcp_server as server
+
+
+@pytest.fixture
+def workspaces(tmp_path, monkeypatch):
+    """Two workspaces 'one' and 'two', and an empty disk cache."""
+    for name in ('one', 'two'):
+        (tmp_path / name / '.west').mkdir(parents=True)
+        (tmp_path / name / '.west' / 'config').write_text('[manifest]\npath = app\nfile = west.yml\n')
+        (tmp_path / name / 'app').mkdir()
+        (tmp_path / name / 'app' / 'west.yml').write_text('manifest:\n  projects: []\n')
+    (tmp_path / 'home').mkdir()
+    monkeypatch.setenv('HOME', str(tmp_path / 'home'))
+    for var in ('ZEPHYR_BASE', 'XDG_CONFIG_HOME', 'WEST_CONFIG_SYSTEM', 'WEST_CONFIG_GLOBAL', 'WEST_CONFIG_LOCAL'):
+        monkeypatch.delenv(var, raising=False)
+    monkeypatch.setattr(server, '_DISK_CACHE_DIR', str(tmp_path / 'cache'))
+    monkeypatch.setattr(server, '_USE_DISK_CACHE', True)
+    monkeypatch.setattr(server, '_topdir_cache', {})
+    return tmp_path
+
+
+def cache(monkeypatch, workspace):
+    """Caches a boards listing in 'workspace'; returns the entry's path."""
+    monkeypatch.chdir(workspace)
+    path = server._disk_cache_path(['boards'])
+    server._disk_cache_put(path, server.WestResult(True, "ok", str(workspace)))
+    return path
+
+
+def test_entries_are_kept_per_workspace(workspaces, monkeypatch):
+    one = cache(monkeypatch, workspaces / 'one')
+    two = cache(monkeypatch, workspaces / 'two')
+    assert os.path.dirname(one) != os.path.dirname(two)
+    assert server._disk_cache_get(one).stdout == str(workspaces / 'one')
+
+
+def test_clear_only_drops_the_current_workspace(workspaces, monkeypatch):
+    one = cache(monkeypatch, workspaces / 'one')
+    two = cache(monkeypatch, workspaces / 'two')
+    server._disk_cache_clear()
+    assert server._disk_cache_get(two) is None
+    assert server._disk_cache_get(one).stdout == str(workspaces / 'one')
+
+
+def test_expired_entries_of_other_workspaces_are_dropped(workspaces, monkeypatch):
+    one = cache(monkeypatch, workspaces / 'one')
+    old = os.stat(one).st_mtime - server._DISK_CACHE_TTL - 1
+    os.utime(one, (old, old))
+    cache(monkeypatch, workspaces / 'two')
+    assert not os.path.exists(os.path.dirname(one))
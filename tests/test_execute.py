@@ -0,0 +1,70 @@
+import asyncio
+import os
+import sys
+import textwrap
+
+import pytest
+
+import west_mcp_server as server
+
+# Writes its pid, floods stdout with 1 MB, then waits to be killed.
+FLOODING_WEST = '''
+import os, sys, time
+with open(sys.argv[-1], 'w') as f:
+    f.write(str(os.getpid()))
+for _ in range(1024):
+    sys.stdout.write('x' * 1023 + '\\n')
+sys.stdout.flush()
+time.sleep(60)
+'''
+
+
+@pytest.fixture
+def flooding_west(tmp_path, monkeypatch):
+    script = tmp_path / 'west'
+    script.write_text(f"#!{sys.executable}\n" + textwrap.dedent(FLOODING_WEST))
+    script.chmod(0o755)
+    monkeypatch.setattr(server, '_WEST_BIN', str(script))
+    return tmp_path / 'pid'
+
+
+def assert_reaped(pid_file):
+    pid = int(pid_file.read_text())
+    with pytest.raises(ProcessLookupError):
+        os.kill(pid, 0)
+
+
+def test_cancelled_command_is_killed(flooding_west):
+    async def main():
+        task = asyncio.ensure_future(
+            server._execute_west_command([str(flooding_west)], True, None, on_line=_ignore))
+        while not flooding_west.exists():
+            await asyncio.sleep(0.05)
+        await asyncio.sleep(0.1)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(main())
+    assert_reaped(flooding_west)
+
+
+def test_failing_line_callback_kills_the_command(flooding_west):
+    async def fail(line):
+        raise RuntimeError("callback failed")
+
+    result = asyncio.run(server._execute_west_command([str(flooding_west)], True, None, on_line=fail))
+    assert not result.success
+    assert "callback failed" in result.message
+    assert_reaped(flooding_west)
+
+
+def test_timed_out_command_is_killed(flooding_west):
+    result = asyncio.run(server._execute_west_command([str(flooding_west)], True, 0.5, on_line=_ignore))
+    assert not result.success
+    assert "timed out" in result.message
+    assert_reaped(flooding_west)
+
+
+async def _ignore(line):
+    pass
@@ -0,0 +1,65 @@
+import asyncio
+
+import west_mcp_server as server
+
+
+def test_merge_keeps_project_order_and_headers():
+    merged = server._merge_project_results(
+        ['zephyr', 'hal_nordic'],
+        [server.WestResult(True, "ok", "a\n"), server.WestResult(True, "ok", "b")],
+    )
+    assert merged == server.WestResult(
+        True, "Command executed successfully.", "=== zephyr ===\na\n=== hal_nordic ===\nb\n", "")
+
+
+def test_merge_only_lists_projects_with_stderr():
+    merged = server._merge_project_results(
+        ['zephyr', 'hal_nordic', 'mcuboot'],
+        [server.WestResult(True, "ok", "", "warning"), server.WestResult(True, "ok"),
+         server.WestResult(True, "ok", "", "other\n")],
+    )
+    assert merged.stdout == "=== zephyr ===\n=== hal_nordic ===\n=== mcuboot ===\n"
+    assert merged.stderr == "=== zephyr ===\nwarning\n=== mcuboot ===\nother\n"
+
+
+def test_merge_fails_if_any_project_fails():
+    merged = server._merge_project_results(
+        ['zephyr', 'hal_nordic', 'mcuboot'],
+        [server.WestResult(True, "ok"), server.WestResult(False, "failed"), server.WestResult(False, "failed")],
+    )
+    assert not merged.success
+    assert merged.message == "Command failed for 2 of 3 projects: hal_nordic, mcuboot."
+
+
+def test_fan_out_merges_in_project_order(west_bin):
+    # The first project's command finishes last.
+    projects = ['0.3', '0.2', '0.1', '0']
+    result = asyncio.run(server._fan_out(lambda project: ['slow', project], projects))
+    assert result.success
+    assert result.stdout == "".join(f"=== {project} ===\nslow done\n" for project in projects)
+
+
+def test_fan_out_reports_the_failing_project(west_bin):
+    commands = {'a': ['echo', 'a'], 'b': ['fail'], 'c': ['echo', 'c']}
+    result = asyncio.run(server._fan_out(commands.get, list(commands)))
+    assert not result.success
+    assert result.message == "Command failed for 1 of 3 projects: b."
+    assert result.stdout == "=== a ===\na\n=== b ===\n=== c ===\nc\n"
+    assert result.stderr == "=== a ===\nto stderr\n=== c ===\nto stderr\n"
+
+
+def test_fan_out_limits_concurrency(west_bin, monkeypatch):
+    running = peak = 0
+
+    async def run(command_args):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return server.WestResult(True, "ok")
+
+    monkeypatch.setattr(server, 'run_west_command', run)
+    result = asyncio.run(server._fan_out(lambda project: ['grep', project], list('abcdefgh'), limit=3))
+    assert result.success
+    assert peak == 3
@@ -0,0 +1,63 @@
+import random
+
+import pytest
+
+import west_mcp_server as server
+
+
+def option_tables():
+    tables = {name: value for name, value in vars(server).items()
+              if name.endswith('_FLAGS') and isinstance(value, tuple)}
+    tables.update((f'_INFO_FLAGS[{key}]', table) for key, table in server._INFO_FLAGS.items())
+    return tables
+
+
+def reference_argv(table, values):
+    """What each option kind means, spelled out one option at a time."""
+    argv = []
+    for flag, name, kind in table:
+        value = values[name]
+        if kind == 'bool':
+            if value:
+                argv.append(flag)
+        elif kind == 'val':
+            if value:
+                argv += [flag, str(value)]
+        elif kind == 'int':
+            if value is not None:
+                argv += [flag, str(value)]
+        elif kind == 'list':
+            for item in value or ():
+                argv += [flag, item]
+        else:
+            raise AssertionError(f"unknown kind {kind!r}")
+    return argv
+
+
+def random_value(rng, kind):
+    if kind == 'bool':
+        return rng.choice([False, True])
+    if kind == 'val':
+        return rng.choice([None, '', 'v', 'with space'])
+    if kind == 'int':
+        return rng.choice([None, 0, 3, 1.5])
+    return rng.choice([None, [], ['a'], ['a', 'b c']])
+
+
+@pytest.mark.parametrize('name, table', sorted(option_tables().items()))
+@pytest.mark.parametrize('generic', [False, True])
+def test_builders_match_reference(name, table, generic, monkeypatch):
+    if generic:
+        # Past the limit, _apply_flags builds argv without generating code.
+        monkeypatch.setattr(server, '_FLAG_BUILDERS', {})
+        monkeypatch.setattr(server, '_FLAG_BUILDERS_MAX', 0)
+    rng = random.Random(name)
+    for _ in range(200):
+        values = {param: random_value(rng, kind) for _, param, kind in table}
+        assert server._apply_flags(['cmd'], table, values) == ['cmd', *reference_argv(table, values)]
+
+
+def test_values_are_not_written_into_generated_code():
+    table = (('-x', 'x', 'val'),)
+    assert server._apply_flags([], table, {'x': "'); import os; ('"}) == ['-x', "'); import os; ('"]
+    assert server._apply_flags([], table, {'x': "{v[0]}"}) == ['-x', '{v[0]}']
@@ -0,0 +1,106 @@
+import textwrap
+
+import pytest
+
+import west_mcp_server as server
+
+pytest.importorskip('yaml')
+
+MANIFEST = '''
+manifest:
+  remotes:
+    - name: upstream
+      url-base: https://github.com/zephyrproject-rtos
+  defaults:
+    remote: upstream
+    revision: main
+  projects:
+    - name: zephyr
+      revision: v3.7.0
+    - name: hal_nordic
+      path: modules/hal/nordic
+      clone-depth: 1
+    - name: other
+      url: https://example.com/other.git
+      revision: deadbeef
+  self:
+    path: app
+'''
+
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch):
+    """A workspace with the manifest in 'app', and no other west configuration."""
+    (tmp_path / '.west').mkdir()
+    (tmp_path / '.west' / 'config').write_text('[manifest]\npath = app\nfile = west.yml\n')
+    (tmp_path / 'app').mkdir()
+    (tmp_path / 'app' / 'west.yml').write_text(MANIFEST)
+    (tmp_path / 'home').mkdir()
+    monkeypatch.setenv('HOME', str(tmp_path / 'home'))
+    for var in ('ZEPHYR_BASE', 'XDG_CONFIG_HOME', 'WEST_CONFIG_SYSTEM', 'WEST_CONFIG_GLOBAL', 'WEST_CONFIG_LOCAL'):
+        monkeypatch.delenv(var, raising=False)
+    monkeypatch.chdir(tmp_path / 'app')
+    monkeypatch.setattr(server, '_topdir_cache', {})
+    monkeypatch.setattr(server, '_local_manifest_cache', {})
+    return tmp_path
+
+
+# Expected outputs are what 'west list' prints for the workspace above.
+def test_list_default_format(workspace):
+    result = server._local_west_query(['list'])
+    assert result.success
+    assert result.stdout == textwrap.dedent('''\
+        manifest     app                          HEAD                                     N/A
+        zephyr       zephyr                       v3.7.0                                   https://github.com/zephyrproject-rtos/zephyr
+        hal_nordic   modules/hal/nordic           main                                     https://github.com/zephyrproject-rtos/hal_nordic
+        other        other                        deadbeef                                 https://example.com/other.git
+        ''')
+
+
+def test_list_format_keys(workspace):
+    fmt = '{name}|{url}|{path}|{abspath}|{posixpath}|{revision}|{clone_depth}|{groups}'
+    top = str(workspace)
+    assert server._local_west_query(['list', '-f', fmt]).stdout == textwrap.dedent(f'''\
+        manifest|N/A|app|{top}/app|{top}/app|HEAD|None|
+        zephyr|https://github.com/zephyrproject-rtos/zephyr|zephyr|{top}/zephyr|{top}/zephyr|v3.7.0|None|
+        hal_nordic|https://github.com/zephyrproject-rtos/hal_nordic|modules/hal/nordic|{top}/modules/hal/nordic|{top}/modules/hal/nordic|main|1|
+        other|https://example.com/other.git|other|{top}/other|{top}/other|deadbeef|None|
+        ''')
+
+
+def test_topdir_and_manifest_path(workspace):
+    assert server._local_west_query(['topdir']).stdout == f"{workspace}\n"
+    assert server._local_west_query(['manifest', '--path']).stdout == f"{workspace}/app/west.yml\n"
+
+
+def test_manifest_changes_are_picked_up(workspace):
+    assert 'other' in server._local_west_query(['list', '-f', '{name}']).stdout
+    (workspace / 'app' / 'west.yml').write_text(MANIFEST.replace('name: other', 'name: renamed'))
+    assert server._local_west_query(['list', '-f', '{name}']).stdout == "manifest\nzephyr\nhal_nordic\nrenamed\n"
+
+
+@pytest.mark.parametrize('command_args', [
+    ['list', '-f', '{name} {sha}'], # Needs git
+    ['list', 'zephyr'], # Project filters
+    ['list', '--all'],
+    ['manifest', '--resolve'],
+])
+def test_other_queries_are_left_to_west(workspace, command_args):
+    assert server._local_west_query(command_args) is None
+
+
+@pytest.mark.parametrize('manifest', [
+    MANIFEST.replace('      revision: v3.7.0', '      revision: v3.7.0\n      import: true'),
+    MANIFEST.replace('  self:\n    path: app', '  self:\n    path: app\n    import: submanifests'),
+    MANIFEST.replace('      clone-depth: 1', '      groups: [hal]'),
+    MANIFEST.replace('name: other', 'name: zephyr'),
+])
+def test_unsupported_manifests_are_left_to_west(workspace, manifest):
+    (workspace / 'app' / 'west.yml').write_text(manifest)
+    assert server._local_west_query(['list']) is None
+
+
+def test_project_filters_are_left_to_west(workspace):
+    with open(workspace / '.west' / 'config', 'a') as f:
+        f.write('project-filter = -zephyr\n')
+    assert server._local_west_query(['list']) is None
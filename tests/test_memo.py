@@ -0,0 +1,137 @@
+import asyncio
+import os
+import time
+
+import pytest
+
+import west_mcp_server as server
+
+
+@pytest.fixture
+def recycles(west_bin, monkeypatch):
+    """Counts how often the workers are recycled."""
+    calls = []
+    monkeypatch.setattr(server._west_workers, 'recycle', lambda: calls.append(1))
+    return calls
+
+
+def boards():
+    return server.run_west_command(['boards'])
+
+
+@pytest.mark.parametrize('command_args, changes', [
+    (['update'], True),
+    (['init', '-l', 'app'], True),
+    (['patch', 'apply'], True),
+    (['config', 'build.board', 'nrf52dk'], True),
+    (['config', '-d', 'build.board'], True),
+    (['config', 'build.board'], False),
+    (['config', '-l'], False),
+    (['forall', '-c', 'git fetch'], True),
+    (['some-extension'], True),
+    (['build', '-b', 'nrf52dk', 'app'], False),
+    (['flash'], False),
+    (['twister', '-p', 'qemu_x86'], False),
+    (['grep', 'main'], False),
+    (['boards'], False),
+])
+def test_what_changes_the_workspace(command_args, changes):
+    assert server._may_change_workspace(command_args) == changes
+
+
+def test_read_only_results_are_reused(west_bin):
+    async def main():
+        first = await boards()
+        assert first.success
+        assert await boards() == first
+
+    asyncio.run(main())
+    assert west_bin() == [['boards']]
+
+
+def test_results_expire(west_bin, monkeypatch):
+    monkeypatch.setitem(server._READONLY_TTL, 'boards', 0.2)
+
+    async def main():
+        first = await boards()
+        assert await boards() == first
+        await asyncio.sleep(0.3)
+        assert (await boards()).stdout != first.stdout
+
+    asyncio.run(main())
+    assert west_bin() == [['boards']] * 2
+
+
+def test_failures_are_not_reused(west_bin):
+    async def main():
+        await server.run_west_command(['boards', 'fail'])
+        await server.run_west_command(['boards', 'fail'])
+
+    asyncio.run(main())
+    assert west_bin() == [['boards', 'fail']] * 2
+
+
+def test_generation_bump_invalidates(west_bin):
+    async def main():
+        first = await boards()
+        server._bump_workspace_generation()
+        assert (await boards()).stdout != first.stdout
+
+    asyncio.run(main())
+    assert west_bin() == [['boards']] * 2
+
+
+def test_zephyr_base_change_invalidates(west_bin, tmp_path, monkeypatch):
+    zephyr = tmp_path / 'zephyr'
+    zephyr.mkdir()
+    monkeypatch.setenv('ZEPHYR_BASE', str(zephyr))
+
+    async def main():
+        first = await boards()
+        later = time.time() + 10
+        os.utime(zephyr, (later, later))
+        assert (await boards()).stdout != first.stdout
+
+    asyncio.run(main())
+    assert west_bin() == [['boards']] * 2
+
+
+def test_mutation_in_flight(west_bin, recycles):
+    async def main():
+        before = await boards()
+        update = asyncio.ensure_future(server.run_west_command(['update', '0.5']))
+        while len(west_bin()) < 2:
+            await asyncio.sleep(0.02)
+        # Neither reuses the result from before the update, nor is kept.
+        during = await boards()
+        assert during.stdout != before.stdout
+        assert not update.done()
+        assert (await update).success
+        after = await boards()
+        assert after.stdout != during.stdout
+        assert await boards() == after
+
+    asyncio.run(main())
+    assert west_bin() == [['boards'], ['update', '0.5'], ['boards'], ['boards']]
+    assert recycles == [1]
+
+
+def test_build_keeps_memoized_results(west_bin, recycles):
+    async def main():
+        first = await boards()
+        await server.run_west_command(['build', 'app'])
+        assert await boards() == first
+
+    asyncio.run(main())
+    assert west_bin() == [['boards'], ['build', 'app']]
+    assert recycles == []
+
+
+def test_fan_out_changes_the_workspace_once(west_bin, recycles):
+    generation = server._workspace_generation
+    projects = [f"p{i}" for i in range(20)]
+    result = asyncio.run(server.forall_projects(command='git fetch', projects=projects))
+    assert result['success']
+    assert sorted(map(tuple, west_bin())) == sorted(('forall', '-c', 'git fetch', project) for project in projects)
+    assert server._workspace_generation == generation + 2
+    assert recycles == [1]
@@ -0,0 +1,75 @@
+import pytest
+
+import west_mcp_server as server
+
+
+@pytest.fixture
+def small_window(monkeypatch):
+    """Shrinks the head/tail window to 8 and 4 bytes."""
+    monkeypatch.setattr(server, '_OUT_HEAD', 8)
+    monkeypatch.setattr(server, '_OUT_TAIL', 4)
+    monkeypatch.setattr(server, '_UNTRUNCATED_CHARS', 3)
+
+
+def feed(buf, data, chunk_size):
+    for i in range(0, len(data), chunk_size):
+        buf.write(data[i:i + chunk_size])
+    return buf.getvalue()
+
+
+@pytest.mark.parametrize('chunk_size', [1, 3, 100])
+def test_output_within_window_is_kept(small_window, chunk_size):
+    assert feed(server._OutputBuffer(), b'0123456789ab', chunk_size) == '0123456789ab'
+
+
+@pytest.mark.parametrize('chunk_size', [1, 3, 5, 100])
+def test_output_is_cut_to_head_and_tail(small_window, chunk_size):
+    data = b'HEADHEAD' + b'x' * 50 + b'TAIL'
+    assert feed(server._OutputBuffer(), data, chunk_size) == 'HEADHEAD\n...[truncated 50 bytes]...\nTAIL'
+
+
+def test_untruncated_buffer_keeps_everything(small_window):
+    data = b'y' * 100
+    assert feed(server._OutputBuffer(truncate=False), data, 7) == 'y' * 100
+
+
+def test_cuts_inside_multibyte_characters_drop_the_partial_characters(small_window):
+    # 'é' is two bytes and '€' three: the head cut falls after the first byte
+    # of the 'é', and the tail cut after the first byte of the '€'.
+    data = 'abcdefg'.encode() + 'é'.encode() + b'-' * 10 + '€'.encode() + b'zz'
+    assert feed(server._OutputBuffer(), data, 3) == 'abcdefg\n...[truncated 12 bytes]...\nzz'
+
+
+def test_invalid_utf8_is_replaced(small_window):
+    assert feed(server._OutputBuffer(), b'ok\xffok', 2) == 'ok�ok'
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 100])
+def test_tail_lines_keeps_last_lines(chunk_size):
+    buf = server._TailLinesBuffer(2)
+    assert feed(buf, b'a\nb\nc\nd\n', chunk_size) == '...[2 earlier lines omitted]...\nc\nd\n'
+
+
+def test_tail_lines_counts_an_unterminated_last_line():
+    buf = server._TailLinesBuffer(2)
+    assert feed(buf, b'a\nb\nc', 1) == '...[1 earlier lines omitted]...\nb\nc'
+
+
+def test_tail_lines_without_dropping():
+    assert feed(server._TailLinesBuffer(5), b'a\nb\n', 1) == 'a\nb\n'
+    assert feed(server._TailLinesBuffer(5), b'', 1) == ''
+
+
+def test_tail_lines_zero_only_counts():
+    assert feed(server._TailLinesBuffer(0), b'a\nb\nc', 2) == '...[3 earlier lines omitted]...\n'
+
+
+def test_new_output_buffer_picks_the_buffer():
+    assert isinstance(server._new_output_buffer(), server._OutputBuffer)
+    assert isinstance(server._new_output_buffer(3), server._TailLinesBuffer)
+
+
+def test_worker_output_is_cut_like_process_output(small_window):
+    text = 'HEADHEAD' + 'x' * 50 + 'TAIL'
+    assert server._decode_worker_output(text, None) == 'HEADHEAD\n...[truncated 50 bytes]...\nTAIL'
+    assert server._decode_worker_output('a\nb\nc\n', 1) == '...[2 earlier lines omitted]...\nc\n'
@@ -0,0 +1,40 @@
+import pytest
+
+import west_mcp_server as server
+
+
+def test_ninja_status_lines():
+    assert server._parse_ninja_progress(b'[12/345] Building C object zephyr/main.c.obj') == \
+        (12, 345, 'Building C object zephyr/main.c.obj')
+    assert server._parse_ninja_progress(b'[1/1] Linking C executable zephyr.elf\xff') == \
+        (1, 1, 'Linking C executable zephyr.elf�')
+
+
+@pytest.mark.parametrize('line', [
+    b'-- west build: building application',
+    b'  [12/345] Building indented',
+    b'[12/345]Building without a space',
+    b'[a/b] Building',
+    b'',
+])
+def test_other_build_output_is_not_progress(line):
+    assert server._parse_ninja_progress(line) is None
+
+
+def test_update_banners_are_counted():
+    parse = server._update_progress_parser(3)
+    assert parse(b'=== updating zephyr (zephyr):') == (1, 3, 'updating zephyr (zephyr)')
+    assert parse(b'From https://github.com/zephyrproject-rtos/zephyr') is None
+    assert parse(b'=== updating hal_nordic (modules/hal/nordic):') == (2, 3, 'updating hal_nordic (modules/hal/nordic)')
+
+
+def test_update_without_known_total():
+    parse = server._update_progress_parser(None)
+    assert parse(b'=== updating mcuboot (bootloader/mcuboot)') == (1, None, 'updating mcuboot (bootloader/mcuboot)')
+    assert parse(b'HEAD is now at 1234567 Release') is None
+
+
+def test_update_parsers_count_separately():
+    first, second = server._update_progress_parser(None), server._update_progress_parser(None)
+    first(b'=== updating a (a):')
+    assert second(b'=== updating b (b):') == (1, None, 'updating b (b)')
@@ -0,0 +1,51 @@
+import asyncio
+
+import pytest
+
+import west_mcp_server as server
+
+
+@pytest.fixture
+def argv(monkeypatch):
+    """Records the argv tools pass to run_west_command instead of running west."""
+    calls = []
+
+    async def run_west_command(command_args, *args, **kwargs):
+        calls.append(list(command_args))
+        return server.WestResult(True, "")
+    monkeypatch.setattr(server, 'run_west_command', run_west_command)
+    return calls
+
+
+def call(tool, **kwargs):
+    return asyncio.run(tool(**kwargs))
+
+
+def test_build_argv(argv):
+    call(server.build_zephyr_project, source_dir='app', board='nrf52dk', pristine='always',
+         shield=['s1', 's2'], cmake_opt=['-DFOO=1'])
+    call(server.build_zephyr_project, source_dir='app', board='nrf52dk')
+    assert argv == [
+        ['build', '-b', 'nrf52dk', '--shield', 's1', '--shield', 's2', '-p', 'always', 'app', '--', '-DFOO=1'],
+        ['build', '-b', 'nrf52dk', 'app'],
+    ]
+
+
+def test_config_argv(argv):
+    call(server.manage_config, name='build.board', value='nrf52dk', scope='local')
+    call(server.manage_config, list=True)
+    assert argv == [['config', '--local', 'build.board', 'nrf52dk'], ['config', '-l']]
+
+
+def test_numeric_options_set_to_zero_are_passed(argv):
+    call(server.run_twister, seed=0, jobs=0, extra_test_args=['--foo'])
+    call(server.init_workspace, rename_delay=0)
+    assert argv == [['twister', '-j', '0', '--seed', '0', '--', '--foo'], ['init', '--rename-delay', '0']]
+
+
+def test_conflicting_options_are_rejected(argv):
+    result = call(server.run_twister, build_only=True, test_only=True)
+    assert not result['success']
+    assert 'build_only and test_only' in result['message']
+    assert not call(server.sign_binary, hex=True, no_hex=True)['success']
+    assert argv == []
@@ -0,0 +1,106 @@
+import asyncio
+import json
+import subprocess
+import sys
+
+import pytest
+
+import west_mcp_server as server
+
+
+@pytest.fixture
+def worker(fake_west):
+    process = subprocess.Popen(
+        [sys.executable, server._WORKER_SCRIPT],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True,
+    )
+    assert json.loads(process.stdout.readline()) == {"ready": True}
+    yield process
+    process.stdin.close()
+    process.wait(timeout=10)
+
+
+def request(worker, *argv):
+    worker.stdin.write(json.dumps({"argv": list(argv)}) + "\n")
+    worker.stdin.flush()
+    return json.loads(worker.stdout.readline())
+
+
+def test_captures_stdout_and_stderr(worker):
+    assert request(worker, 'echo', 'a', 'b') == {"rc": 0, "stdout": "a b\n", "stderr": "to stderr\n"}
+
+
+def test_captures_child_process_output(worker):
+    assert request(worker, 'child')["stdout"] == "from child\n"
+
+
+def test_carries_undecodable_bytes_as_surrogates(worker):
+    stdout = request(worker, 'bytes')["stdout"]
+    assert stdout.encode('utf-8', 'surrogateescape') == b'\xff\xfeok\n'
+    assert server._decode_worker_output(stdout, None) == '��ok\n'
+
+
+def test_exit_codes(worker):
+    assert request(worker, 'fail')["rc"] == 3
+    reply = request(worker, 'message')
+    assert reply["rc"] == 1
+    assert "something went wrong" in reply["stderr"]
+    reply = request(worker, 'raise')
+    assert reply["rc"] == 1
+    assert "RuntimeError: boom" in reply["stderr"]
+
+
+def test_commands_cannot_read_the_request_stream(worker):
+    assert request(worker, 'stdin')["stdout"] == "''\n"
+    # The worker still serves the next request.
+    assert request(worker, 'echo', 'next')["stdout"] == "next\n"
+
+
+def test_server_worker_is_replaced_after_recycle(fake_west, monkeypatch):
+    monkeypatch.setattr(server, '_west_python', lambda: [sys.executable])
+
+    async def main():
+        worker = server._WestWorker()
+        worker.disabled = False
+        processes = []
+        try:
+            first = await worker.run(['pid'])
+            processes.append(worker.process)
+            assert first[0] == 0
+            assert await worker.run(['pid']) == first
+            worker.recycle()
+            second = await worker.run(['pid'])
+            processes.append(worker.process)
+            assert second[0] == 0 and second[1] != first[1]
+        finally:
+            worker._stop()
+            for process in processes:
+                await process.wait()
+
+    asyncio.run(main())
+
+
+def test_cancelled_command_does_not_leak_its_reply(fake_west, monkeypatch):
+    monkeypatch.setattr(server, '_west_python', lambda: [sys.executable])
+
+    async def main():
+        worker = server._WestWorker()
+        worker.disabled = False
+        processes = []
+        try:
+            await worker.warm_up()
+            processes.append(worker.process)
+            slow = asyncio.ensure_future(worker.run(['slow', '0.5']))
+            await asyncio.sleep(0.2) # The request has been written
+            slow.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await slow
+            reply = await worker.run(['echo', 'second'])
+            processes.append(worker.process)
+            assert reply[:2] == (0, "second\n")
+        finally:
+            worker._stop()
+            for process in processes:
+                await process.wait()
+
+    asyncio.run(main())
@@ -1,114 +1,1423 @@
+import asyncio
+import codecs
+import collections
+import configparser
+import contextlib
+import functools
+import hashlib
+import itertools
+import json
+import os
+import re
+import shlex
+import shutil
+import string
 import subprocess
+import sys
+import time
 import logging
-import re
-from typing import Optional, List, Dict, Any
+import operator
+from typing import Optional, List, Dict, Any, Awaitable, Callable, NamedTuple, Tuple
 
 from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp.utilities.func_metadata import FuncMetadata
 
 # Configure basic logging for the server
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+@contextlib.asynccontextmanager
+async def _lifespan(server: FastMCP):
+    """
+    Starts the west workers with the server, so quick commands find them
+    ready, and prefetches the results clients usually ask for first.
+    """
+    _west_workers.start()
+    prefetch = asyncio.ensure_future(_prefetch())
+    try:
+        yield {}
+    finally:
+        prefetch.cancel()
+        _west_workers.stop()
+
 # Initialize the MCP server with a name
-mcp = FastMCP("WestMCP")
+mcp = FastMCP("WestMCP", lifespan=_lifespan)
+
+class WestResult(NamedTuple):
+    """
+    Result of a west command or of a tool's argument validation.
+
+    Tools return it as a plain dict (see _west_tool); FastMCP would otherwise
+    serialize the tuple as a list of separate values.
+    """
+    success: bool
+    message: str
+    stdout: str = ""
+    stderr: str = ""
+    pid: Optional[int] = None # Only set for commands started in the background
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Returns the result as the dict exposed to MCP clients."""
+        result = {
+            "success": self.success,
+            "message": self.message,
+            "stdout": self.stdout,
+            "stderr": self.stderr
+        }
+        if self.pid is not None:
+            result["pid"] = self.pid
+        return result
+
+# FastMCP validates every call's arguments against a pydantic model of the
+# tool's parameters. Local agents that are trusted to send well-formed
+# arguments can set WEST_MCP_SKIP_VALIDATION to have them passed as sent.
+_SKIP_VALIDATION = bool(os.environ.get('WEST_MCP_SKIP_VALIDATION'))
+
+class _UnvalidatedFuncMetadata(FuncMetadata):
+    """FuncMetadata that calls the tool without validating its arguments."""
+
+    async def call_fn_with_arg_validation(self, fn, fn_is_async, arguments_to_validate, arguments_to_pass_directly):
+        # Still decode list arguments that clients send as JSON strings.
+        arguments = self.pre_parse_json(arguments_to_validate)
+        arguments |= arguments_to_pass_directly or {}
+        return await fn(**arguments) if fn_is_async else fn(**arguments)
+
+def _west_tool():
+    """
+    Registers an async function as an MCP tool, like mcp.tool(), converting
+    WestResult return values to dicts.
+
+    Returns:
+        callable: The decorator.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            result = await fn(*args, **kwargs)
+            return result.as_dict() if isinstance(result, WestResult) else result
+        registered = mcp.tool()(wrapper)
+        if _SKIP_VALIDATION:
+            # The input schema clients see is unchanged; only the check is skipped.
+            tool = mcp._tool_manager.get_tool(fn.__name__)
+            tool.fn_metadata = _UnvalidatedFuncMetadata.model_construct(**dict(tool.fn_metadata))
+        return registered
+    return decorator
 
 # --- Helper Function for Running West Commands ---
-def run_west_command(command_args: List[str]) -> Dict[str, Any]:
+# Absolute path of the west executable, looked up once instead of searching
+# $PATH for every command. If west isn't installed, commands fail with
+# _WEST_NOT_FOUND rather than the server refusing to start.
+_WEST_BIN = shutil.which('west')
+_WEST_NOT_FOUND = WestResult(
+    False,
+    "'west' command not found. Please ensure west is installed and in your system's PATH.",
+    "",
+    "FileNotFoundError: 'west' command not found."
+)
+
+# Extra arguments for every subprocess the server starts. CPython only takes its
+# posix_spawn() path, which avoids duplicating the server's address space, when
+# the executable is given as a path and close_fds is False. Leaving close_fds
+# off is safe since Python creates its own descriptors non-inheritable.
+_SPAWN_KWARGS = {'close_fds': False}
+
+# Size of each read from the west process' stdout/stderr pipes.
+_READ_CHUNK = 16 * 1024
+
+# Captured output keeps the first _OUT_HEAD and last _OUT_TAIL bytes of each
+# stream and drops the middle. Set WEST_MCP_NO_TRUNCATE to keep everything.
+_OUT_HEAD = 1 << 20
+_OUT_TAIL = 1 << 18
+_TRUNCATE_OUTPUT = not os.environ.get('WEST_MCP_NO_TRUNCATE')
+
+class _OutputBuffer:
+    """Accumulates a byte stream, keeping only its head and tail once it grows too large."""
+
+    def __init__(self, truncate: bool = True):
+        self.truncate = truncate
+        self.head = bytearray()
+        self.tail = collections.deque()
+        self.tail_size = 0
+        self.total = 0
+
+    def write(self, chunk: bytes) -> None:
+        self.total += len(chunk)
+        if not self.truncate:
+            self.head += chunk
+            return
+        room = _OUT_HEAD - len(self.head)
+        if room > 0:
+            self.head += chunk[:room]
+            chunk = chunk[room:]
+            if not chunk:
+                return
+        self.tail.append(chunk)
+        self.tail_size += len(chunk)
+        # Drop whole chunks from the front while the rest still covers _OUT_TAIL bytes.
+        while self.tail_size - len(self.tail[0]) >= _OUT_TAIL:
+            self.tail_size -= len(self.tail.popleft())
+
+    def getvalue(self) -> str:
+        """
+        Decodes the captured output, marking where the middle was dropped.
+
+        Output is decoded exactly once, here; bytes that aren't valid UTF-8
+        become U+FFFD instead of failing the whole command.
+        """
+        if not self.tail:
+            return self.head.decode('utf-8', 'replace')
+        tail = b''.join(self.tail)[-_OUT_TAIL:]
+        dropped = self.total - len(self.head) - len(tail)
+        if not dropped:
+            return (self.head + tail).decode('utf-8', 'replace')
+
+        # The cuts can land inside a multi-byte character: the incremental
+        # decoder holds back a trailing partial character, and leading
+        # continuation bytes are skipped.
+        head = codecs.getincrementaldecoder('utf-8')('replace').decode(self.head)
+        start = 0
+        while start < min(3, len(tail)) and tail[start] & 0xC0 == 0x80:
+            start += 1
+        return f"{head}\n...[truncated {dropped} bytes]...\n{tail[start:].decode('utf-8', 'replace')}"
+
+class _TailLinesBuffer:
+    """Accumulates a byte stream, keeping only its last 'lines' lines."""
+
+    def __init__(self, lines: int):
+        self.max_lines = max(lines, 0)
+        self.lines = collections.deque(maxlen=self.max_lines or None)
+        self.partial = b''
+        self.seen = 0
+
+    def write(self, chunk: bytes) -> None:
+        parts = (self.partial + chunk).split(b'\n')
+        # An unterminated line can't grow without bound either.
+        self.partial = parts.pop()[-_OUT_TAIL:]
+        if self.max_lines:
+            self.lines.extend(parts)
+        self.seen += len(parts)
+
+    def getvalue(self) -> str:
+        """Decodes the kept lines, noting how many earlier lines were dropped."""
+        lines = list(self.lines)
+        total = self.seen
+        if self.partial:
+            lines.append(self.partial)
+            total += 1
+        lines = lines[-self.max_lines:] if self.max_lines else []
+        text = b'\n'.join(lines)
+        if lines and not self.partial:
+            text += b'\n'
+        text = text.decode('utf-8', 'replace')
+        dropped = total - len(lines)
+        return f"...[{dropped} earlier lines omitted]...\n{text}" if dropped else text
+
+def _new_output_buffer(tail_lines: Optional[int] = None):
+    """Returns the buffer for one captured stream: the last 'tail_lines' lines if given."""
+    if tail_lines is not None:
+        return _TailLinesBuffer(tail_lines)
+    return _OutputBuffer(_TRUNCATE_OUTPUT)
+
+# Called with each complete line of a command's stdout, without its newline.
+_LineCallback = Callable[[bytes], Awaitable[None]]
+
+async def _read_stream(stream: asyncio.StreamReader, buf: _OutputBuffer, stream_name: str,
+                       on_line: Optional[_LineCallback] = None) -> None:
     """
-    Executes a west command and captures its output.
+    Reads a process pipe into 'buf' until EOF.
+
+    Output is logged at DEBUG level as it arrives, so long-running commands
+    such as 'west build' show progress in the server log. If 'on_line' is
+    given, it is awaited with each complete line as soon as it arrives.
+    """
+    log_chunks = logger.isEnabledFor(logging.DEBUG)
+    partial = b''
+    while True:
+        chunk = await stream.read(_READ_CHUNK)
+        if not chunk:
+            return
+        buf.write(chunk)
+        if log_chunks:
+            logger.debug("%s: %s", stream_name, chunk.decode('utf-8', 'replace').rstrip())
+        if on_line is not None:
+            lines = (partial + chunk).split(b'\n')
+            partial = lines.pop()[-_OUT_TAIL:]
+            for line in lines:
+                await on_line(line)
+
+async def _communicate(process: asyncio.subprocess.Process,
+                      tail_lines: Optional[int] = None,
+                      on_line: Optional[_LineCallback] = None) -> Tuple[str, str]:
+    """
+    Drains a process' stdout and stderr concurrently, then waits for it to exit.
 
     Args:
-        command_args (list): A list of strings representing the west command
-                             and its arguments (e.g., ['build', '-b', 'nrf52840dk_nrf52840', 'path/to/project']).
+        process (asyncio.subprocess.Process): A process started with stdout and stderr pipes.
+        tail_lines (int, optional): Only keep this many trailing lines of each stream.
+        on_line (callable, optional): Awaited with each line of stdout as it arrives.
 
     Returns:
-        dict: A dictionary containing 'success' (boolean), 'message' (string),
-              'stdout' (string), and 'stderr' (string).
+        tuple: The decoded (stdout, stderr) output, truncated per _OutputBuffer
+               or _TailLinesBuffer.
+    """
+    stdout_buf = _new_output_buffer(tail_lines)
+    stderr_buf = _new_output_buffer(tail_lines)
+    await asyncio.gather(
+        _read_stream(process.stdout, stdout_buf, 'stdout', on_line),
+        _read_stream(process.stderr, stderr_buf, 'stderr'),
+    )
+    # Only wait once both pipes hit EOF, so the child never blocks writing.
+    await process.wait()
+    return stdout_buf.getvalue(), stderr_buf.getvalue()
+
+def _decode_output(data: bytes, tail_lines: Optional[int] = None) -> str:
+    """Decodes complete output received in one piece, truncated like streamed output."""
+    buf = _new_output_buffer(tail_lines)
+    buf.write(data)
+    return buf.getvalue()
+
+# Text can't encode to more than 4 UTF-8 bytes per character, so output this
+# short is never truncated by _OutputBuffer.
+_UNTRUNCATED_CHARS = (_OUT_HEAD + _OUT_TAIL) // 4
+_SURROGATE_ESCAPE_RE = re.compile('[\udc80-\udcff]')
+
+def _decode_worker_output(text: str, tail_lines: Optional[int] = None) -> str:
     """
-    full_command = ['west'] + command_args
-    logger.info(f"Executing command: {' '.join(full_command)}")
+    Finishes decoding output from the west worker, whose replies carry bytes
+    that aren't valid UTF-8 as surrogate escapes.
 
-    try:
-        result = subprocess.run(
-            full_command,
-            capture_output=True,
-            text=True,
-            check=True,
-            encoding='utf-8'
+    Output that is valid UTF-8 and too short to truncate, which is the usual
+    case, is returned as is rather than encoded back to bytes and decoded again.
+    """
+    if (tail_lines is None
+            and (not _TRUNCATE_OUTPUT or len(text) <= _UNTRUNCATED_CHARS)
+            and (text.isascii() or not _SURROGATE_ESCAPE_RE.search(text))):
+        return text
+    return _decode_output(text.encode('utf-8', 'surrogateescape'), tail_lines)
+
+# --- Persistent west worker ---
+# Quick, read-only commands are sent to a long-lived west_mcp_worker.py process
+# that has already imported west, instead of paying interpreter startup and
+# west's imports on every call. Set WEST_MCP_NO_WORKER to always spawn west.
+_WORKER_COMMANDS = frozenset({
+    '--help', 'help', 'boards', 'shields', 'list', 'topdir', 'manifest', 'config',
+    'completion', 'status', 'diff', 'compare',
+})
+_WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'west_mcp_worker.py')
+_USE_WORKER = not os.environ.get('WEST_MCP_NO_WORKER')
+# Number of workers, so that quick commands from concurrent tool calls don't
+# queue behind each other. Override with WEST_MCP_WORKERS.
+_WORKER_COUNT = max(1, int(os.environ.get('WEST_MCP_WORKERS') or min(4, os.cpu_count() or 1)))
+# Upper bound on one reply line from the worker; larger replies fall back to spawning west.
+_WORKER_REPLY_LIMIT = 1 << 26
+
+def _west_python() -> List[str]:
+    """
+    Returns the command that starts the Python interpreter west is installed in.
+
+    west is often installed in a different environment than the server (e.g.
+    the server runs under 'uv run'), so read the interpreter from the west
+    script's shebang line, falling back to the server's own interpreter.
+    """
+    if _WEST_BIN:
+        try:
+            with open(_WEST_BIN, 'rb') as f:
+                first_line = f.readline(512)
+        except OSError:
+            first_line = b''
+        if first_line.startswith(b'#!'):
+            interpreter = first_line[2:].decode('utf-8', 'replace').split()
+            if interpreter and os.path.basename(interpreter[0]) == 'env':
+                interpreter = [arg for arg in interpreter[1:] if not arg.startswith('-')]
+            if interpreter and 'python' in os.path.basename(interpreter[0]):
+                interpreter[0] = shutil.which(interpreter[0]) or interpreter[0]
+                return interpreter
+    return [sys.executable]
+
+class _WestWorker:
+    """A west_mcp_worker.py process, restarted on demand if it dies."""
+
+    def __init__(self):
+        self.process = None
+        self.loop = None
+        self.lock = None
+        self.disabled = not _USE_WORKER
+        self.pending = 0 # Commands queued on or running in this worker
+        self.stale = False # Replace the process before the next command
+
+    async def _start(self) -> None:
+        self.loop = asyncio.get_running_loop()
+        self.process = await asyncio.create_subprocess_exec(
+            *_west_python(), _WORKER_SCRIPT,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            limit=_WORKER_REPLY_LIMIT,
+            **_SPAWN_KWARGS
+        )
+        ready = await self.process.stdout.readline()
+        if not ready:
+            # Most likely west isn't importable from that interpreter; don't retry.
+            self.disabled = True
+            logger.warning("West worker failed to start; running west as a separate process per command.")
+            await self.process.wait()
+            self.process = None
+
+    def _stop(self) -> None:
+        if self.process is not None and self.process.returncode is None:
+            self.process.kill()
+        self.process = None
+
+    def recycle(self) -> None:
+        """
+        Makes the worker start a new process before its next command.
+
+        West runs extension commands from the workspace, but the modules they
+        import stay loaded in the worker, so it has to start over once the
+        workspace may have changed.
+        """
+        self.stale = True
+
+    def _ensure_fresh(self) -> None:
+        if self.stale:
+            self.stale = False
+            self._stop()
+
+    def _bind_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self.loop is not loop:
+            # Both the process transport and the lock belong to one event loop.
+            self._stop()
+            self.loop = loop
+            self.lock = asyncio.Lock()
+
+    async def warm_up(self) -> None:
+        """Starts the worker process ahead of its first command."""
+        if self.disabled:
+            return
+        self._bind_loop()
+        async with self.lock:
+            self._ensure_fresh()
+            if self.process is None or self.process.returncode is not None:
+                try:
+                    await self._start()
+                except BaseException:
+                    # Cancelled before the ready line: the next command would read it as its reply.
+                    self._stop()
+                    raise
+
+    async def run(self, command_args: List[str]) -> Optional[Tuple[int, str, str]]:
+        """
+        Runs a west command in the worker.
+
+        Args:
+            command_args (list): The west command and its arguments.
+
+        Returns:
+            tuple: (exit code, stdout, stderr), as sent by the worker (see
+                   _decode_worker_output), or None if the worker is
+                   unavailable and the caller should spawn west itself.
+        """
+        if self.disabled:
+            return None
+        self._bind_loop()
+        async with self.lock:
+            try:
+                self._ensure_fresh()
+                if self.process is None or self.process.returncode is not None:
+                    await self._start()
+                    if self.process is None:
+                        return None
+                self.process.stdin.write(json.dumps({"argv": command_args}).encode() + b"\n")
+                await self.process.stdin.drain()
+                reply = await self.process.stdout.readline()
+                if not reply:
+                    raise EOFError("worker exited")
+                reply = json.loads(reply)
+            except Exception as e:
+                logger.warning("West worker failed (%r); falling back to a separate west process.", e)
+                self._stop()
+                return None
+            except BaseException:
+                # Cancelled mid-exchange: the unread reply would go to the next command.
+                self._stop()
+                raise
+        return reply["rc"], reply["stdout"], reply["stderr"]
+
+class _WestWorkerPool:
+    """A fixed set of _WestWorkers; each command goes to the least busy one."""
+
+    def __init__(self, count: int):
+        self.workers = [_WestWorker() for _ in range(count)]
+        self.warm_up_task = None
+
+    def start(self) -> None:
+        """Starts all workers in the background, without waiting for them."""
+        self.warm_up_task = asyncio.ensure_future(
+            asyncio.gather(*(worker.warm_up() for worker in self.workers), return_exceptions=True)
         )
-        logger.info(f"Command successful: {' '.join(full_command)}")
-        return {
-            "success": True,
-            "message": "Command executed successfully.",
-            "stdout": result.stdout,
-            "stderr": result.stderr
-        }
-    except subprocess.CalledProcessError as e:
-        # Check for specific error messages indicating an unknown subcommand
-        if "unknown command" in e.stderr.lower() or "invalid choice" in e.stderr.lower():
-            error_message = f"West subcommand '{command_args[0]}' not found or invalid."
-        else:
-            error_message = f"Command failed with exit code {e.returncode}."
 
-        logger.error(f"{error_message}: {' '.join(full_command)}")
-        logger.error(f"Stdout: {e.stdout}")
-        logger.error(f"Stderr: {e.stderr}")
-        return {
-            "success": False,
-            "message": error_message,
-            "stdout": e.stdout,
-            "stderr": e.stderr
-        }
+    def recycle(self) -> None:
+        """Replaces every worker's process, starting the new ones in the background."""
+        for worker in self.workers:
+            worker.recycle()
+        if not all(worker.disabled for worker in self.workers):
+            self.start()
+
+    def stop(self) -> None:
+        if self.warm_up_task is not None:
+            self.warm_up_task.cancel()
+            self.warm_up_task = None
+        for worker in self.workers:
+            worker._stop()
+
+    async def run(self, command_args: List[str]) -> Optional[Tuple[int, str, str]]:
+        """Runs a command like _WestWorker.run, in the worker with the fewest pending commands."""
+        workers = [worker for worker in self.workers if not worker.disabled]
+        if not workers:
+            return None
+        worker = min(workers, key=lambda w: w.pending)
+        worker.pending += 1
+        try:
+            return await worker.run(command_args)
+        finally:
+            worker.pending -= 1
+
+_west_workers = _WestWorkerPool(_WORKER_COUNT)
+
+# Processes started without waiting for them (see run_west_command's 'timeout=0').
+_background_processes: Dict[int, subprocess.Popen] = {}
+
+def _start_background(process: subprocess.Popen) -> None:
+    """Keeps a reference to a background process and reaps any that have exited."""
+    for pid, proc in list(_background_processes.items()):
+        if proc.poll() is not None:
+            del _background_processes[pid]
+    _background_processes[process.pid] = process
+
+# west and argparse report an unknown command near the start of stderr, so only
+# its first _UNKNOWN_COMMAND_SCAN characters are searched.
+_UNKNOWN_COMMAND_RE = re.compile(r'unknown command|invalid choice', re.IGNORECASE)
+_UNKNOWN_COMMAND_SCAN = 4096
+
+class _CommandLine:
+    """
+    Formats a command for log messages, only when a message is actually emitted.
+
+    Passed as a %-style logging argument, so the shell-quoted string is built
+    at most once per command, and not at all when the log level is disabled.
+    """
+    __slots__ = ('argv', 'program', '_text')
+
+    def __init__(self, argv: List[str], program: Optional[str] = None):
+        self.argv = argv
+        self.program = program
+        self._text = None
+
+    def __str__(self) -> str:
+        if self._text is None:
+            self._text = shlex.join([self.program, *self.argv] if self.program else self.argv)
+        return self._text
+
+async def _execute_west_command(command_args: List[str],
+                               capture: bool,
+                               timeout: Optional[float],
+                               tail_lines: Optional[int] = None,
+                               on_line: Optional[_LineCallback] = None) -> WestResult:
+    """Runs a west command; see run_west_command, which adds result memoization."""
+    if _WEST_BIN is None:
+        logger.error("'west' command not found. Ensure west is installed and in your system's PATH.")
+        return _WEST_NOT_FOUND
+
+    # The argv is only joined with the west path where a process is started;
+    # commands answered by a worker never build the combined list.
+    cmd_str = _CommandLine(command_args, _WEST_BIN)
+    logger.info("Executing command: %s", cmd_str)
+
+    try:
+        if not capture and timeout == 0:
+            # Plain Popen: an asyncio child would be killed with its event loop.
+            process = subprocess.Popen(
+                [_WEST_BIN, *command_args],
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                **_SPAWN_KWARGS
+            )
+            _start_background(process)
+            logger.info("Started in the background (pid %d): %s", process.pid, cmd_str)
+            return WestResult(
+                True,
+                f"Command started in the background (pid {process.pid}).",
+                pid=process.pid
+            )
+
+        reply = None
+        if capture and timeout is None and on_line is None and command_args and command_args[0] in _WORKER_COMMANDS:
+            reply = await _west_workers.run(command_args)
+
+        if reply is not None:
+            returncode = reply[0]
+            stdout, stderr = _decode_worker_output(reply[1], tail_lines), _decode_worker_output(reply[2], tail_lines)
+        else:
+            # The server's stdin carries the MCP transport, so never hand it to west.
+            pipe = asyncio.subprocess.PIPE if capture else asyncio.subprocess.DEVNULL
+            process = await asyncio.create_subprocess_exec(
+                _WEST_BIN, *command_args,
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=pipe,
+                stderr=pipe,
+                **_SPAWN_KWARGS
+            )
+            try:
+                if capture:
+                    stdout, stderr = await asyncio.wait_for(_communicate(process, tail_lines, on_line), timeout)
+                else:
+                    await asyncio.wait_for(process.wait(), timeout)
+                    stdout = stderr = ""
+            except BaseException:
+                # Timed out, cancelled, or an on_line callback failed: nothing
+                # drains the pipes any more, so west could block on them forever.
+                if process.returncode is None:
+                    process.kill()
+                    await process.wait()
+                raise
+            returncode = process.returncode
     except FileNotFoundError:
+        # west was removed after startup.
         logger.error("'west' command not found. Ensure west is installed and in your system's PATH.")
-        return {
-            "success": False,
-            "message": "'west' command not found. Please ensure west is installed and in your system's PATH.",
-            "stdout": "",
-            "stderr": "FileNotFoundError: 'west' command not found."
-        }
+        return _WEST_NOT_FOUND
+    except asyncio.TimeoutError:
+        logger.error("Command timed out after %s seconds: %s", timeout, cmd_str)
+        return WestResult(False, f"Command timed out after {timeout} seconds.")
     except Exception as e:
-        logger.error(f"An unexpected error occurred: {e}")
+        logger.error("An unexpected error occurred: %s", e)
+        return WestResult(False, f"An unexpected error occurred: {e}", "", str(e))
+
+    if returncode == 0:
+        logger.info("Command successful: %s", cmd_str)
+        return WestResult(True, "Command executed successfully.", stdout, stderr)
+
+    # Check for specific error messages indicating an unknown subcommand
+    if _UNKNOWN_COMMAND_RE.search(stderr, 0, _UNKNOWN_COMMAND_SCAN):
+        error_message = f"West subcommand '{command_args[0]}' not found or invalid."
+    else:
+        error_message = f"Command failed with exit code {returncode}."
+
+    logger.error("%s: %s", error_message, cmd_str)
+    logger.error("Stdout: %s", stdout)
+    logger.error("Stderr: %s", stderr)
+    return WestResult(False, error_message, stdout, stderr)
+
+# --- In-process answers for simple workspace queries ---
+# 'west topdir', 'west manifest --path' and plain 'west list' only read
+# .west/config and the manifest file, so answer them without starting west.
+# Anything beyond the simple cases (imports, groups, project filters,
+# git-backed format keys, ...) still goes to west. PyYAML is optional; without
+# it 'west list' always goes to west.
+try:
+    import yaml
+    _YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+except ImportError:
+    yaml = None
+
+_LIST_DEFAULT_FORMAT = '{name:12} {path:28} {revision:40} {url}'
+# 'west list' format keys that don't need git or west's full manifest model.
+_LIST_LOCAL_KEYS = frozenset({'name', 'url', 'path', 'abspath', 'posixpath', 'revision', 'clone_depth', 'groups'})
+_LOCAL_PROJECT_KEYS = frozenset({
+    'name', 'path', 'revision', 'remote', 'repo-path', 'url', 'clone-depth',
+    'west-commands', 'submodules', 'userdata', 'description',
+})
+_LOCAL_MANIFEST_KEYS = frozenset({'version', 'remotes', 'defaults', 'projects', 'self'})
+
+# cwd -> workspace topdir
+_topdir_cache: Dict[str, str] = {}
+# Parsed manifests, keyed by the (path, mtime) of every file they were read from.
+_local_manifest_cache: Dict[str, Tuple[Tuple, Any]] = {}
+
+class _NeedsWest(Exception):
+    """Raised when a query can't be answered without west itself."""
+
+def _find_topdir() -> str:
+    """
+    Finds the workspace topdir the way west does: the nearest directory with
+    a .west subdirectory, starting at cwd and then at $ZEPHYR_BASE.
+    """
+    cwd = os.getcwd()
+    topdir = _topdir_cache.get(cwd)
+    if topdir is not None and os.path.isdir(os.path.join(topdir, '.west')):
+        return topdir
+    for start in (cwd, os.environ.get('ZEPHYR_BASE')):
+        if not start:
+            continue
+        current = os.path.abspath(start)
+        while True:
+            if os.path.isdir(os.path.join(current, '.west')):
+                _topdir_cache[cwd] = current
+                return current
+            parent = os.path.dirname(current)
+            if parent == current:
+                break
+            current = parent
+    raise _NeedsWest("no workspace")
+
+def _file_stamp(path: str) -> Tuple[str, Optional[int]]:
+    try:
+        return path, os.stat(path).st_mtime_ns
+    except OSError:
+        return path, None
+
+def _read_manifest_config(topdir: str) -> Tuple[List[Tuple[str, Optional[int]]], str, str]:
+    """
+    Reads the manifest location from the west configuration files.
+
+    Returns:
+        tuple: (stamps of the files read, manifest repository path, manifest file name).
+    """
+    if any(var in os.environ for var in ('WEST_CONFIG_SYSTEM', 'WEST_CONFIG_GLOBAL', 'WEST_CONFIG_LOCAL')):
+        raise _NeedsWest("custom configuration file locations")
+    paths = ['/etc/westconfig', '/usr/local/etc/westconfig', os.path.expanduser('~/.westconfig')]
+    if os.environ.get('XDG_CONFIG_HOME'):
+        paths.append(os.path.join(os.environ['XDG_CONFIG_HOME'], 'west', 'config'))
+    paths.append(os.path.join(topdir, '.west', 'config'))
+
+    config = configparser.ConfigParser()
+    config.read(paths, encoding='utf-8')
+    if config.has_option('manifest', 'project-filter') or config.has_option('manifest', 'group-filter'):
+        raise _NeedsWest("project filters")
+    if not config.has_option('manifest', 'path'):
+        raise _NeedsWest("no manifest.path")
+    return ([_file_stamp(p) for p in paths], config.get('manifest', 'path'),
+            config.get('manifest', 'file', fallback='west.yml'))
+
+def _load_local_manifest(topdir: str) -> Tuple[str, str, Any]:
+    """
+    Returns (manifest repository path, manifest file path, parsed manifest),
+    re-reading the files only when one of them changed.
+    """
+    stamps, repo_path, file_name = _read_manifest_config(topdir)
+    manifest_file = os.path.join(topdir, repo_path, file_name)
+    stamps.append(_file_stamp(manifest_file))
+    key = tuple(stamps)
+    cached = _local_manifest_cache.get(topdir)
+    if cached is not None and cached[0] == key:
+        return repo_path, manifest_file, cached[1]
+    if yaml is None:
+        raise _NeedsWest("PyYAML is not installed")
+    with open(manifest_file, encoding='utf-8') as f:
+        manifest = yaml.load(f, Loader=_YAML_LOADER)['manifest']
+    _local_manifest_cache[topdir] = (key, manifest)
+    return repo_path, manifest_file, manifest
+
+def _local_projects(topdir: str) -> List[Dict[str, Any]]:
+    """Resolves the manifest's projects into 'west list' format values."""
+    repo_path, _, manifest = _load_local_manifest(topdir)
+    if set(manifest) - _LOCAL_MANIFEST_KEYS or set(manifest.get('self') or {}) - {'path', 'west-commands'}:
+        raise _NeedsWest("imports or other unsupported manifest features")
+    remotes = {remote['name']: remote['url-base'] for remote in manifest.get('remotes') or []}
+    defaults = manifest.get('defaults') or {}
+
+    def entry(name, path, revision, url, clone_depth=None):
+        abspath = os.path.normpath(os.path.join(topdir, path))
         return {
-            "success": False,
-            "message": f"An unexpected error occurred: {str(e)}",
-            "stdout": "",
-            "stderr": str(e)
+            'name': name, 'url': url or 'N/A', 'path': path, 'abspath': abspath,
+            'posixpath': abspath.replace(os.sep, '/'), 'revision': revision,
+            'clone_depth': clone_depth or 'None', 'groups': '',
         }
 
-# --- Helper for common runner options ---
-def _add_runner_options(base_command: List[str],
-                        build_dir: Optional[str],
-                        runner: Optional[str],
-                        skip_rebuild: Optional[bool],
-                        domain: Optional[str],
-                        board_dir: Optional[str],
-                        gdb: Optional[str],
-                        openocd: Optional[str],
-                        openocd_search: Optional[str]) -> List[str]:
-    """Helper to append common runner-related options to a command."""
-    cmd = list(base_command) # Create a mutable copy
-    if build_dir:
-        cmd.extend(['-d', build_dir])
-    if runner:
-        cmd.extend(['-r', runner])
-    if skip_rebuild:
-        cmd.append('--skip-rebuild')
-    if domain:
-        cmd.extend(['--domain', domain])
-    if board_dir:
-        cmd.extend(['--board-dir', board_dir])
-    if gdb:
-        cmd.extend(['--gdb', gdb])
-    if openocd:
-        cmd.extend(['--openocd', openocd])
-    if openocd_search:
-        cmd.extend(['--openocd-search', openocd_search])
-    return cmd
+    projects = [entry('manifest', repo_path, 'HEAD', None)]
+    for project in manifest.get('projects') or []:
+        if set(project) - _LOCAL_PROJECT_KEYS:
+            raise _NeedsWest("imports or groups")
+        name = project['name']
+        url = project.get('url')
+        if not url:
+            remote = project.get('remote', defaults.get('remote'))
+            url = f"{remotes[remote]}/{project.get('repo-path', name)}"
+        projects.append(entry(name, project.get('path', name),
+                              project.get('revision', defaults.get('revision', 'master')),
+                              url, project.get('clone-depth')))
+    if len({project['name'] for project in projects}) != len(projects):
+        raise _NeedsWest("duplicate project names")
+    return projects
+
+# Queries whose in-process answer may mean reading and parsing the manifest;
+# run_west_command does those in a thread so they don't stall other tool calls.
+_LOCAL_PARSE_COMMANDS = frozenset({'list', 'manifest'})
+
+def _in_thread(fn: Callable, *args: Any) -> 'asyncio.Future':
+    """Runs blocking file I/O in the event loop's default executor."""
+    return asyncio.get_running_loop().run_in_executor(None, fn, *args)
+
+def _local_west_query(command_args: List[str]) -> Optional[WestResult]:
+    """
+    Answers 'topdir', 'manifest --path' and 'list [-f FORMAT]' in-process.
+
+    Returns:
+        WestResult: The command's result, or None if west has to run it.
+    """
+    try:
+        if command_args == ['topdir']:
+            stdout = _find_topdir() + "\n"
+        elif command_args == ['manifest', '--path']:
+            stdout = _load_local_manifest(_find_topdir())[1] + "\n"
+        elif command_args[:1] == ['list'] and len(command_args) in (1, 3) and command_args[1:2] in ([], ['-f']):
+            fmt = command_args[2] if len(command_args) == 3 else _LIST_DEFAULT_FORMAT
+            keys = {field for _, field, _, _ in string.Formatter().parse(fmt) if field is not None}
+            if not keys <= _LIST_LOCAL_KEYS:
+                raise _NeedsWest("format keys that need west")
+            stdout = "".join(fmt.format(**project) + "\n" for project in _local_projects(_find_topdir()))
+        else:
+            return None
+    except Exception as e:
+        logger.debug("Running west for %s: %r", command_args, e)
+        return None
+    logger.info("Answered in-process: west %s", _CommandLine(command_args))
+    return WestResult(True, "Command executed successfully.", stdout)
+
+# --- Memoization of read-only west commands ---
+# Read-only commands and how many seconds their results stay valid. Commands
+# that depend on git working tree state get a shorter lifetime, since the user
+# can change it without going through the server.
+_READONLY_TTL = {
+    '--help': 300.0,
+    'help': 300.0,
+    'boards': 300.0,
+    'shields': 300.0,
+    'list': 300.0,
+    'topdir': 300.0,
+    'completion': 300.0,
+    'manifest': 300.0,
+    'bindesc': 300.0,
+    'compare': 30.0,
+    'diff': 30.0,
+    'status': 30.0,
+}
+# Commands that aren't memoized, but can't change the manifest, the projects'
+# checkouts or the extension commands either, so they don't invalidate what is
+# memoized. They may still write files, like build directories or 'west
+# gtags' index files. Any other command, including unknown ones run through
+# run_arbitrary_west_command, is assumed to change the workspace.
+_NON_MUTATING_COMMANDS = frozenset({
+    'grep', 'gtags', 'build', 'flash', 'debug', 'debugserver', 'attach', 'rtt',
+    'robot', 'simulate', 'sign', 'twister', 'spdx', 'bindesc', 'zephyr-export',
+})
+# Twister options that only list tests and exit, and options that still make
+# it write files when given with them.
+_TWISTER_LISTING_OPTIONS = frozenset({'--list-tests', '--test-tree', '--list-tags'})
+_TWISTER_WRITING_OPTIONS = frozenset({'-E', '--save-tests'})
+# 'west manifest' options whose output depends on the projects' git state.
+_GIT_STATE_MANIFEST_OPTIONS = frozenset({'--freeze', '--untracked'})
+_MEMO_MAXSIZE = 256
+
+# Bumped before and after every command that may change the workspace, so that results
+# memoized before (or during) a possible workspace change are never reused.
+_workspace_generation = 0
+
+# tuple(command_args) -> (expiry time, generation, $ZEPHYR_BASE mtime, result),
+# least recently used first. Entries are also dropped when the mtime of
+# $ZEPHYR_BASE changes, e.g. when zephyr is checked out again outside the server.
+_west_memo: 'collections.OrderedDict[Tuple[str, ...], Tuple[float, int, Optional[float], WestResult]]' = collections.OrderedDict()
+
+def _workspace_mtime() -> Optional[float]:
+    """
+    Returns the mtime of $ZEPHYR_BASE, or None if it is unset or missing.
+    """
+    zephyr_base = os.environ.get('ZEPHYR_BASE')
+    if not zephyr_base:
+        return None
+    try:
+        return os.stat(zephyr_base).st_mtime
+    except OSError:
+        return None
+
+def _readonly_ttl(command_args: List[str]) -> Optional[float]:
+    """Returns how long the result of 'command_args' may be reused, or None if it can't be."""
+    if not command_args:
+        return None
+    if command_args[0] == 'manifest' and '-o' in command_args:
+        return None # Writes the resolved manifest to a file
+    if command_args[0] == 'blobs':
+        return 300.0 if command_args[1:2] == ['list'] else None
+    if command_args[0] == 'manifest' and not _GIT_STATE_MANIFEST_OPTIONS.isdisjoint(command_args):
+        return 30.0 # Project revisions or untracked files
+    if command_args[0] == 'list' and any('{sha' in arg for arg in command_args):
+        return 30.0
+    if '--help' in command_args:
+        # Unless it's after '--', e.g. for CMake in 'west build -- --help'.
+        if '--' not in command_args or command_args.index('--help') < command_args.index('--'):
+            return 300.0
+    if command_args[0] == 'config':
+        # Configuration files are often edited outside the server.
+        return 15.0 if '-l' in command_args else None
+    if command_args[0] == 'sdk':
+        return 30.0 if command_args[1:2] == ['list'] else None
+    if command_args[0] == 'twister':
+        if _TWISTER_LISTING_OPTIONS.isdisjoint(command_args) or not _TWISTER_WRITING_OPTIONS.isdisjoint(command_args):
+            return None
+        return 15.0
+    return _READONLY_TTL.get(command_args[0])
+
+def _bump_workspace_generation() -> None:
+    global _workspace_generation
+    _workspace_generation += 1
+
+def _may_change_workspace(command_args: List[str]) -> bool:
+    """Returns whether 'command_args' may change what other west commands report."""
+    if not command_args or _readonly_ttl(command_args) is not None:
+        return False
+    if command_args[0] == 'config':
+        # Only deleting or setting an option; 'west config NAME' just reads it.
+        positional = [arg for arg in command_args[1:] if not arg.startswith('-')]
+        return '-d' in command_args or '-D' in command_args or len(positional) > 1
+    return command_args[0] not in _NON_MUTATING_COMMANDS
+
+# --- On-disk cache for slow read-only commands ---
+# 'west boards', 'west shields' and 'west manifest --resolve' can take seconds,
+# and their output normally only changes when the manifest or a project's
+# checkout does. Their results are kept in _DISK_CACHE_DIR across server
+# restarts, keyed on the command, the workspace and the stamps of the files
+# that describe it, including every project's HEAD. Each workspace has its
+# own subdirectory, which is emptied when a command that may modify that
+# workspace runs through the server.
+# Entries also expire after _DISK_CACHE_TTL, which bounds staleness from
+# changes the stamps don't see (e.g. uncommitted board files).
+# Set WEST_MCP_NO_DISK_CACHE to disable it.
+_DISK_CACHE_DIR = os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'), 'west-mcp')
+_DISK_CACHE_TTL = 24 * 3600.0
+_USE_DISK_CACHE = not os.environ.get('WEST_MCP_NO_DISK_CACHE')
+# Options whose results depend on directories the cache key doesn't stamp.
+_DISK_CACHE_EXCLUDED_OPTIONS = frozenset({'--arch-root', '--board-root', '--soc-root', '--board-dir', '--freeze', '-o'})
+# How deep below the topdir to look for project repositories. Zephyr's
+# modules are at most three levels down (e.g. modules/hal/nordic).
+_PROJECT_SCAN_DEPTH = 4
+
+def _disk_cacheable(command_args: List[str]) -> bool:
+    if not _USE_DISK_CACHE or not _DISK_CACHE_EXCLUDED_OPTIONS.isdisjoint(command_args):
+        return False
+    if command_args[0] == 'manifest':
+        return '--resolve' in command_args
+    return command_args[0] in ('boards', 'shields')
+
+def _git_head_stamps(repo: str) -> List[Tuple[str, Optional[int]]]:
+    """Stamps a repository's HEAD and, if it's on a branch, the branch ref."""
+    head = os.path.join(repo, '.git', 'HEAD')
+    stamps = [_file_stamp(head)]
+    try:
+        with open(head, encoding='utf-8') as f:
+            ref = f.read().strip()
+    except OSError:
+        return stamps
+    if ref.startswith('ref: '):
+        stamps.append(_file_stamp(os.path.join(repo, '.git', ref[5:])))
+    return stamps
+
+def _workspace_repos(topdir: str) -> List[str]:
+    """
+    Finds the git repositories in a workspace, i.e. its projects, without west.
+
+    Manifests usually import their project lists, so the checkouts are found
+    on disk instead. Hidden directories, build directories and repositories'
+    own subdirectories are not searched.
+    """
+    repos = []
+    level = [topdir]
+    for _ in range(_PROJECT_SCAN_DEPTH):
+        below = []
+        for directory in level:
+            try:
+                entries = [e for e in os.scandir(directory) if not e.name.startswith('.') and e.is_dir()]
+            except OSError:
+                continue
+            for entry in entries:
+                if os.path.exists(os.path.join(entry.path, '.git')):
+                    repos.append(entry.path)
+                elif not os.path.exists(os.path.join(entry.path, 'CMakeCache.txt')):
+                    below.append(entry.path)
+        level = below
+    return sorted(repos)
+
+def _digest(text: str) -> str:
+    return hashlib.blake2b(text.encode('utf-8', 'surrogateescape'), digest_size=16).hexdigest()
+
+def _disk_cache_workspace_dir(topdir: str) -> str:
+    return os.path.join(_DISK_CACHE_DIR, _digest(topdir))
+
+def _disk_cache_path(command_args: List[str]) -> Optional[str]:
+    """
+    Returns the cache file for 'command_args' in the current workspace, or
+    None if the workspace can't be identified without west.
+    """
+    try:
+        topdir = _find_topdir()
+        stamps, repo_path, file_name = _read_manifest_config(topdir)
+    except (_NeedsWest, configparser.Error, ValueError) as e:
+        # West reports a broken configuration itself.
+        logger.debug("Not using the disk cache for %s: %r", command_args, e)
+        return None
+    manifest_repo = os.path.join(topdir, repo_path)
+    stamps.append(_file_stamp(os.path.join(manifest_repo, file_name)))
+    zephyr_base = os.environ.get('ZEPHYR_BASE') or os.path.join(topdir, 'zephyr')
+    repos = _workspace_repos(topdir)
+    if os.path.abspath(zephyr_base) not in repos:
+        repos.append(zephyr_base)
+    for repo in repos:
+        stamps += _git_head_stamps(repo)
+    key = json.dumps([_WEST_BIN, topdir, zephyr_base, stamps, command_args])
+    return os.path.join(_disk_cache_workspace_dir(topdir), _digest(key) + '.json')
+
+def _disk_cache_get(path: str) -> Optional[WestResult]:
+    try:
+        with open(path, encoding='utf-8') as f:
+            entry = json.load(f)
+        if time.time() >= entry['expires']:
+            return None
+        return WestResult(True, entry['message'], entry['stdout'], entry['stderr'])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+def _disk_cache_lookup(command_args: List[str]) -> Tuple[Optional[str], Optional[WestResult]]:
+    """Returns (cache file, cached result), either of which may be None."""
+    path = _disk_cache_path(command_args)
+    return path, _disk_cache_get(path) if path else None
+
+def _disk_cache_clear() -> None:
+    """Drops the current workspace's entries, after something may have changed it."""
+    if not _USE_DISK_CACHE:
+        return
+    try:
+        directory = _disk_cache_workspace_dir(_find_topdir())
+    except _NeedsWest:
+        return
+    try:
+        for old in os.scandir(directory):
+            if old.name.endswith('.json'):
+                os.unlink(old.path)
+    except OSError as e:
+        if not isinstance(e, FileNotFoundError):
+            logger.debug("Not clearing the disk cache: %r", e)
+
+def _disk_cache_drop_expired(now: float) -> None:
+    """Drops expired entries of every workspace, and workspaces left without any."""
+    for workspace in os.scandir(_DISK_CACHE_DIR):
+        if not workspace.is_dir():
+            continue
+        for old in os.scandir(workspace.path):
+            if old.name.endswith('.json') and old.stat().st_mtime < now - _DISK_CACHE_TTL:
+                os.unlink(old.path)
+        try:
+            os.rmdir(workspace.path)
+        except OSError:
+            pass # Not empty
+
+def _disk_cache_put(path: str, result: WestResult) -> None:
+    """Writes a result atomically, and drops expired entries while at it."""
+    now = time.time()
+    entry = {'expires': now + _DISK_CACHE_TTL, 'message': result.message,
+             'stdout': result.stdout, 'stderr': result.stderr}
+    try:
+        _disk_cache_drop_expired(now)
+    except OSError as e:
+        logger.debug("Not dropping expired disk cache entries: %r", e)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp = f"{path}.{os.getpid()}.tmp"
+        with open(temp, 'w', encoding='utf-8') as f:
+            json.dump(entry, f)
+        os.replace(temp, path)
+    except OSError as e:
+        logger.debug("Not caching result on disk: %r", e)
+
+# Number of workspace changes in progress; see _workspace_change.
+_workspace_changes = 0
+
+@contextlib.asynccontextmanager
+async def _workspace_change():
+    """
+    Invalidates the memo and the disk cache around a change of the workspace,
+    and restarts the workers after it.
+
+    Overlapping changes, like the per-project commands of one fan-out, are
+    handled as one: the invalidation before runs when the first one starts,
+    and the one after when the last one ends.
+    """
+    global _workspace_changes
+    _workspace_changes += 1
+    try:
+        if _workspace_changes == 1:
+            _bump_workspace_generation()
+            await _in_thread(_disk_cache_clear)
+        yield
+    finally:
+        _workspace_changes -= 1
+        if not _workspace_changes:
+            _bump_workspace_generation()
+            _west_workers.recycle()
+            await _in_thread(_disk_cache_clear)
+
+async def _run_unmemoized(command_args: List[str],
+                          capture: bool,
+                          timeout: Optional[float],
+                          tail_lines: Optional[int],
+                          on_line: Optional[_LineCallback]) -> WestResult:
+    """Runs a command outside the memo, as a workspace change if it may be one."""
+    if not _may_change_workspace(command_args):
+        return await _execute_west_command(command_args, capture, timeout, tail_lines, on_line)
+    async with _workspace_change():
+        return await _execute_west_command(command_args, capture, timeout, tail_lines, on_line)
+
+# --- Coalescing of identical in-flight commands ---
+# Concurrent identical 'west update' or 'west build' runs would only fight over
+# the same git locks and build directory, so a duplicate of one that's still
+# running waits for it and shares its result instead of starting west again.
+_COALESCED_COMMANDS = frozenset({'build', 'update'})
+
+# (argv, tail_lines) -> the task running that command.
+_inflight: Dict[Tuple, 'asyncio.Future[WestResult]'] = {}
+
+async def _run_coalesced(command_args: List[str],
+                         tail_lines: Optional[int],
+                         on_line: Optional[_LineCallback]) -> WestResult:
+    """
+    Runs a mutating command, or joins the identical one already running.
+
+    Only the caller that started the command gets its on_line callbacks. The
+    command keeps running if that caller is cancelled, for the others' sake.
+    """
+    key = (tuple(command_args), tail_lines)
+    task = _inflight.get(key)
+    if task is not None and not task.done() and task.get_loop() is asyncio.get_running_loop():
+        logger.info("Joining the identical command already running: %s", _CommandLine(command_args))
+    else:
+        task = asyncio.ensure_future(_run_unmemoized(command_args, True, None, tail_lines, on_line))
+        _inflight[key] = task
+
+        def forget(done: 'asyncio.Future[WestResult]') -> None:
+            if _inflight.get(key) is done:
+                del _inflight[key]
+        task.add_done_callback(forget)
+    return await asyncio.shield(task)
+
+async def run_west_command(command_args: List[str],
+                           capture: bool = True,
+                           timeout: Optional[float] = None,
+                           tail_lines: Optional[int] = None,
+                           on_line: Optional[_LineCallback] = None) -> WestResult:
+    """
+    Executes a west command and captures its output, without blocking the event loop.
+
+    Independent tool calls therefore overlap instead of queueing behind each
+    other's west processes.
+
+    Args:
+        command_args (list): A list of strings representing the west command
+                             and its arguments (e.g., ['build', '-b', 'nrf52840dk_nrf52840', 'path/to/project']).
+        capture (bool, optional): Capture stdout and stderr. When False, both are
+                                  discarded, which suits long-lived or interactive
+                                  commands whose output the client can't consume.
+        timeout (float, optional): Seconds to wait for the command to finish; None
+                                   waits indefinitely. With capture=False, 0 starts
+                                   the command in the background and returns its
+                                   'pid' right away.
+        tail_lines (int, optional): Only return the last 'tail_lines' lines of
+                                    stdout and stderr, instead of their first
+                                    1 MiB and last 256 KiB.
+        on_line (callable, optional): Awaited with each line of stdout while the
+                                      command runs, e.g. to report progress.
+
+    Returns:
+        WestResult: 'success', 'message', 'stdout' and 'stderr', plus 'pid'
+                    for background commands.
+    """
+    ttl = _readonly_ttl(command_args)
+    memoize = ttl is not None and capture and tail_lines is None and on_line is None
+    if not memoize:
+        # Trimmed or uncaptured output isn't memoized; only commands that may
+        # modify the workspace invalidate what is.
+        if ttl is None and capture and timeout is None and command_args and command_args[0] in _COALESCED_COMMANDS:
+            return await _run_coalesced(command_args, tail_lines, on_line)
+        return await _run_unmemoized(command_args, capture, timeout, tail_lines, on_line)
+
+    if command_args[0] in _LOCAL_PARSE_COMMANDS:
+        result = await _in_thread(_local_west_query, command_args)
+    else:
+        result = _local_west_query(command_args)
+    if result is not None:
+        return result
+
+    key = tuple(command_args)
+    mtime = _workspace_mtime()
+    entry = _west_memo.get(key)
+    if entry is not None:
+        expires, generation, cached_mtime, result = entry
+        if generation == _workspace_generation and cached_mtime == mtime and time.monotonic() < expires:
+            _west_memo.move_to_end(key)
+            logger.info("Reusing result of: %s", _CommandLine(command_args))
+            return result
+        del _west_memo[key]
+
+    generation = _workspace_generation
+    disk_path = result = None
+    if _disk_cacheable(command_args):
+        disk_path, result = await _in_thread(_disk_cache_lookup, command_args)
+    if result is not None:
+        logger.info("Reusing result from disk of: %s", _CommandLine(command_args))
+    else:
+        result = await _execute_west_command(command_args, capture, timeout)
+        if disk_path and result.success and generation == _workspace_generation:
+            await _in_thread(_disk_cache_put, disk_path, result)
+    # Don't keep failures, which are often transient, or results that raced a mutation.
+    if result.success and generation == _workspace_generation:
+        _west_memo[key] = (time.monotonic() + ttl, generation, mtime, result)
+        while len(_west_memo) > _MEMO_MAXSIZE:
+            _west_memo.popitem(last=False)
+    return result
+
+# --- Helper for table-driven option encoding ---
+# Option tables map a tool's parameters to west flags. Each entry is
+# (flag, parameter name, kind), where kind is one of:
+#   'bool': append the flag if the parameter is truthy
+#   'val':  append the flag followed by the parameter's value, as a string
+#   'int':  like 'val', but for numbers, which are passed even when 0
+#   'list': append the flag and one item for each item in the parameter's list
+_FLAG_TOKENS = {
+    'bool': lambda flag, value: (flag,),
+    'val': lambda flag, value: (flag, f"{value}"),
+    'int': lambda flag, value: (flag, f"{value}"),
+    'list': lambda flag, value: _flag_pairs(flag, value),
+}
+# How each kind tells whether the option is set; the default is truthiness.
+_FLAG_IS_SET = {
+    'int': lambda value: value is not None,
+}
+
+def _flag_pairs(flag: str, items: List[str]):
+    """Yields flag, item, flag, item, ... with the loop running in C (chain, zip and repeat)."""
+    return itertools.chain.from_iterable(zip(itertools.repeat(flag), items))
+
+# Tools are called with the same few combinations of options over and over, so
+# _apply_flags generates one builder function per (table, set options) pair
+# with no per-option branches left in it. Tables are module-level constants,
+# so id(table) identifies them for the life of the process.
+_FLAG_GETTERS: Dict[int, Tuple[Callable, Callable]] = {}
+_FLAG_BUILDERS: Dict[Tuple[int, Tuple[bool, ...]], Callable] = {}
+_FLAG_BUILDERS_MAX = 512
+
+def _flag_getter(table: Tuple[Tuple[str, str, str], ...]) -> Tuple[Callable, Callable]:
+    """
+    Returns a function that picks the table's parameter values, as a tuple, out
+    of a dict, and one that maps those values to a tuple of 'is set' flags.
+    """
+    getters = _FLAG_GETTERS.get(id(table))
+    if getters is None:
+        names = [name for _, name, _ in table]
+        if len(names) == 1:
+            single = operator.itemgetter(names[0])
+            getter = lambda values: (single(values),)
+        else:
+            getter = operator.itemgetter(*names)
+        tests = [_FLAG_IS_SET.get(kind, bool) for _, _, kind in table]
+        if all(test is bool for test in tests):
+            is_set = lambda v: tuple(map(bool, v))
+        else:
+            is_set = lambda v: tuple(test(value) for test, value in zip(tests, v))
+        getters = _FLAG_GETTERS[id(table)] = (getter, is_set)
+    return getters
+
+def _compile_flag_builder(table: Tuple[Tuple[str, str, str], ...], present: Tuple[bool, ...]) -> Callable:
+    """
+    Generates a function that appends exactly the options flagged in 'present'.
+
+    The generated function takes the command and the tuple from _flag_getter.
+    Only flags from the table are written into its source, never parameter values.
+    """
+    tokens = []
+    for i, ((flag, _, kind), is_set) in enumerate(zip(table, present)):
+        if not is_set:
+            continue
+        if kind == 'bool':
+            tokens.append(repr(flag))
+        elif kind in ('val', 'int'):
+            tokens.append(f"{flag!r}, f'{{v[{i}]}}'")
+        else:
+            tokens.append(f"*pairs({flag!r}, v[{i}])")
+    body = f"    cmd += ({', '.join(tokens)},)\n" if tokens else ""
+    namespace: Dict[str, Any] = {'pairs': _flag_pairs}
+    exec(f"def build(cmd, v):\n{body}    return cmd\n", namespace)
+    return namespace['build']
+
+def _apply_flags(cmd: List[str], table: Tuple[Tuple[str, str, str], ...], values: Dict[str, Any]) -> List[str]:
+    """
+    Appends the options from 'table' that are set in 'values' to 'cmd'.
+
+    Args:
+        cmd (list): The command being built; it is modified in place.
+        table (tuple): The option table, see above.
+        values (dict): Parameter values by name, usually the tool's locals().
+
+    Returns:
+        list: 'cmd', for convenience.
+    """
+    if not table:
+        return cmd
+    getter, is_set = _flag_getter(table)
+    v = getter(values)
+    key = (id(table), is_set(v))
+    build = _FLAG_BUILDERS.get(key)
+    if build is None:
+        if len(_FLAG_BUILDERS) >= _FLAG_BUILDERS_MAX:
+            # Unusually many combinations; build this one generically.
+            cmd += itertools.chain.from_iterable(
+                _FLAG_TOKENS[kind](flag, value)
+                for (flag, _, kind), value in itertools.compress(zip(table, v), key[1])
+            )
+            return cmd
+        build = _FLAG_BUILDERS[key] = _compile_flag_builder(table, key[1])
+    return build(cmd, v)
+
+def _find_conflict(groups: Tuple[Tuple[str, ...], ...], values: Dict[str, Any]) -> Optional[WestResult]:
+    """
+    Checks that at most one parameter of each group in 'groups' is set.
+
+    Used for options that west would reject, or silently let the last one win,
+    so the call fails before west is started.
+
+    Returns:
+        WestResult: An error naming the conflicting parameters, or None.
+    """
+    for group in groups:
+        given = [name for name in group if values[name]]
+        if len(given) > 1:
+            return WestResult(False, f"Parameters {' and '.join(given)} can't be used together.")
+    return None
+
+# --- Helper for running a command once per project ---
+# Maximum number of west processes _fan_out runs at the same time. Per-project
+# commands like 'git grep' mix I/O with regex work, so allow two per CPU.
+_FAN_OUT_LIMIT = min(32, (os.cpu_count() or 4) * 2)
+
+def _merge_project_results(projects: List[str], results: List[WestResult]) -> WestResult:
+    """
+    Combines per-project results into one, with a '=== project ===' header
+    before each project's output.
+    """
+    def section(project: str, text: str) -> str:
+        return f"=== {project} ===\n{text}" + ("\n" if text and not text.endswith("\n") else "")
+
+    failed = [project for project, result in zip(projects, results) if not result.success]
+    if failed:
+        message = f"Command failed for {len(failed)} of {len(projects)} projects: {', '.join(failed)}."
+    else:
+        message = "Command executed successfully."
+    return WestResult(
+        not failed,
+        message,
+        "".join(section(project, result.stdout) for project, result in zip(projects, results)),
+        "".join(section(project, result.stderr) for project, result in zip(projects, results) if result.stderr)
+    )
+
+async def _fan_out(build_command: Callable[[str], List[str]],
+                   projects: List[str],
+                   limit: int = _FAN_OUT_LIMIT) -> WestResult:
+    """
+    Runs one west command per project concurrently, instead of one west
+    command that visits the projects one after another.
+
+    Args:
+        build_command (callable): Returns the west command for one project.
+        projects (list): The projects to run it for.
+        limit (int, optional): Maximum number of commands running at once.
+
+    Returns:
+        WestResult: The merged result, see _merge_project_results.
+    """
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run_one(project: str) -> WestResult:
+        async with semaphore:
+            return await run_west_command(build_command(project))
+
+    def run_all() -> 'asyncio.Future[List[WestResult]]':
+        return asyncio.gather(*(run_one(project) for project in projects))
+
+    if _may_change_workspace(build_command(projects[0])):
+        # One change for all projects, not one per project.
+        async with _workspace_change():
+            results = await run_all()
+    else:
+        results = await run_all()
+    return _merge_project_results(projects, results)
+
+# --- Helper for reporting progress to the client ---
+# Ninja's status lines ("[12/345] Building C object ...") and west update's
+# per-project banners ("=== updating zephyr (zephyr):").
+_NINJA_PROGRESS_RE = re.compile(rb'\[(\d+)/(\d+)\] ')
+_UPDATE_BANNER_RE = re.compile(rb'=== (updating .*?):?$')
+
+# Turns a line of output into (progress, total, message), or None.
+_ProgressParser = Callable[[bytes], Optional[Tuple[float, Optional[float], str]]]
+
+def _progress_reporter(parse: _ProgressParser) -> Optional[_LineCallback]:
+    """
+    Returns an on_line callback that reports progress for the current tool call.
+
+    Args:
+        parse (callable): A _ProgressParser for the command's output.
+
+    Returns:
+        callable: The callback, or None if the client didn't ask for progress
+                  (or there is no request), in which case output isn't scanned.
+    """
+    ctx = mcp.get_context()
+    try:
+        meta = ctx.request_context.meta
+    except ValueError:
+        return None
+    if meta is None or meta.progressToken is None:
+        return None
+
+    async def on_line(line: bytes) -> None:
+        progress = parse(line)
+        if progress is not None:
+            await ctx.report_progress(*progress)
+    return on_line
+
+def _parse_ninja_progress(line: bytes) -> Optional[Tuple[float, Optional[float], str]]:
+    match = _NINJA_PROGRESS_RE.match(line)
+    if match is None:
+        return None
+    return int(match[1]), int(match[2]), line[match.end():].decode('utf-8', 'replace')
+
+def _update_progress_parser(total: Optional[int]) -> _ProgressParser:
+    """Returns a parser counting west update's project banners, out of 'total' if known."""
+    updated = 0
+
+    def parse(line: bytes) -> Optional[Tuple[float, Optional[float], str]]:
+        nonlocal updated
+        match = _UPDATE_BANNER_RE.match(line)
+        if match is None:
+            return None
+        updated += 1
+        return updated, total, match[1].decode('utf-8', 'replace')
+    return parse
+
+# --- Options common to the runner commands ---
+_RUNNER_FLAGS = (
+    ('-d', 'build_dir', 'val'),
+    ('-r', 'runner', 'val'),
+    ('--skip-rebuild', 'skip_rebuild', 'bool'),
+    ('--domain', 'domain', 'val'),
+    ('--board-dir', 'board_dir', 'val'),
+    ('--gdb', 'gdb', 'val'),
+    ('--openocd', 'openocd', 'val'),
+    ('--openocd-search', 'openocd_search', 'val'),
+)
 
 # --- MCP Tool for `west completion` ---
-@mcp.tool()
-def get_completion_script(shell: str) -> Dict[str, Any]:
+_VALID_SHELLS = frozenset({'bash', 'fish', 'powershell', 'zsh'})
+_INVALID_SHELL_MESSAGE = f"Invalid shell specified. Must be one of: {', '.join(sorted(_VALID_SHELLS))}."
+
+@_west_tool()
+async def get_completion_script(shell: str) -> Dict[str, Any]:
     """
     Outputs shell completion scripts for west.
 
@@ -119,19 +1428,44 @@ def get_completion_script(shell: str) -> Dict[str, Any]:
     Returns:
         dict: Command execution result.
     """
-    if shell not in ['bash', 'fish', 'powershell', 'zsh']:
-        return {
-            "success": False,
-            "message": "Invalid shell specified. Must be one of: bash, fish, powershell, zsh.",
-            "stdout": "",
-            "stderr": ""
-        }
+    if shell not in _VALID_SHELLS:
+        return WestResult(False, _INVALID_SHELL_MESSAGE)
     command_args = ['completion', shell]
-    return run_west_command(command_args)
+    return await run_west_command(command_args)
 
 # --- MCP Tool for `west boards`, `west shields`, `west list`, and `west topdir` ---
-@mcp.tool()
-def get_west_info(
+_INFO_FLAGS = {
+    'boards': (
+        ('-n', 'name_re', 'val'),
+        ('-f', 'format_string', 'val'),
+        ('--board', 'board', 'val'),
+        ('--arch-root', 'arch_root', 'list'),
+        ('--board-root', 'board_root', 'list'),
+        ('--soc-root', 'soc_root', 'list'),
+        ('--board-dir', 'board_dir', 'val'),
+    ),
+    'shields': (
+        ('-n', 'name_re', 'val'),
+        ('-f', 'format_string', 'val'),
+        ('--board-root', 'board_root', 'list'),
+    ),
+    'list': (
+        ('-a', 'all', 'bool'),
+        ('-i', 'inactive', 'bool'),
+        ('--manifest-path-from-yaml', 'manifest_path_from_yaml', 'bool'),
+        ('-f', 'format_string', 'val'),
+    ),
+    'topdir': (),
+}
+_INVALID_INFO_SUB_MESSAGE = f"Invalid subcommand. Must be one of: {', '.join(_INFO_FLAGS)}."
+
+@functools.lru_cache(maxsize=64)
+def _compile_name_re(name_re: str) -> 're.Pattern':
+    """Compiles a 'name_re' filter; west matches it with Python's re as well."""
+    return re.compile(name_re)
+
+@_west_tool()
+async def get_west_info(
     subcommand: str,
     name_re: Optional[str] = None,
     format_string: Optional[str] = None,
@@ -165,60 +1499,55 @@ def get_west_info(
     Returns:
         dict: Command execution result.
     """
-    valid_subcommands = ['boards', 'shields', 'list', 'topdir']
-    if subcommand not in valid_subcommands:
-        return {
-            "success": False,
-            "message": f"Invalid subcommand. Must be one of: {', '.join(valid_subcommands)}.",
-            "stdout": "",
-            "stderr": ""
-        }
+    if subcommand not in _INFO_FLAGS:
+        return WestResult(False, _INVALID_INFO_SUB_MESSAGE)
+
+    if name_re and subcommand in ('boards', 'shields'):
+        # Reject a bad pattern here rather than after starting west.
+        try:
+            pattern = _compile_name_re(name_re)
+        except re.error as e:
+            return WestResult(False, f"Invalid 'name_re' regular expression: {e}.")
+        if not format_string:
+            # With the default '{name}' format each line is one name, so filter
+            # the full listing, which is memoized, instead of having west walk
+            # the board tree again for every pattern.
+            command_args = _apply_flags([subcommand], _INFO_FLAGS[subcommand], dict(locals(), name_re=None))
+            result = await run_west_command(command_args)
+            if not result.success:
+                return result
+            names = [name for name in result.stdout.splitlines(keepends=True) if pattern.search(name.rstrip('\n'))]
+            return result._replace(stdout=''.join(names))
+
+    command_args = _apply_flags([subcommand], _INFO_FLAGS[subcommand], locals())
+    if subcommand == 'list' and projects:
+        command_args.extend(projects)
 
-    command_args = [subcommand]
-
-    if subcommand == 'boards':
-        if name_re:
-            command_args.extend(['-n', name_re])
-        if format_string:
-            command_args.extend(['-f', format_string])
-        if board:
-            command_args.extend(['--board', board])
-        if arch_root:
-            for r in arch_root:
-                command_args.extend(['--arch-root', r])
-        if board_root:
-            for r in board_root:
-                command_args.extend(['--board-root', r])
-        if soc_root:
-            for r in soc_root:
-                command_args.extend(['--soc-root', r])
-        if board_dir:
-            command_args.extend(['--board-dir', board_dir])
-    elif subcommand == 'shields':
-        if name_re:
-            command_args.extend(['-n', name_re])
-        if format_string:
-            command_args.extend(['-f', format_string])
-        if board_root:
-            for r in board_root:
-                command_args.extend(['--board-root', r])
-    elif subcommand == 'list':
-        if all:
-            command_args.append('-a')
-        if inactive:
-            command_args.append('-i')
-        if manifest_path_from_yaml:
-            command_args.append('--manifest-path-from-yaml')
-        if format_string:
-            command_args.extend(['-f', format_string])
-        if projects:
-            command_args.extend(projects)
-
-    return run_west_command(command_args)
+    return await run_west_command(command_args)
 
 # --- MCP Tool for Building Zephyr Projects (`west build`) ---
-@mcp.tool()
-def build_zephyr_project(
+_BUILD_FLAGS = (
+    ('-b', 'board', 'val'),
+    ('-d', 'build_dir', 'val'),
+    ('-f', 'force', 'bool'),
+    ('-c', 'cmake', 'bool'),
+    ('--cmake-only', 'cmake_only', 'bool'),
+    ('--domain', 'domain', 'val'),
+    ('-t', 'target', 'val'),
+    ('-T', 'test_item', 'val'),
+    ('-o', 'build_opt', 'list'),
+    ('-n', 'just_print', 'bool'),
+    ('-S', 'snippet', 'list'),
+    ('--shield', 'shield', 'list'),
+    ('--extra-conf', 'extra_conf', 'list'),
+    ('--extra-dtc-overlay', 'extra_dtc_overlay', 'list'),
+    ('-p', 'pristine', 'val'),
+    ('--sysbuild', 'sysbuild', 'bool'),
+    ('--no-sysbuild', 'no_sysbuild', 'bool'),
+)
+
+@_west_tool()
+async def build_zephyr_project(
     source_dir: str,
     board: str,
     build_dir: Optional[str] = None,
@@ -237,7 +1566,8 @@ def build_zephyr_project(
     pristine: Optional[str] = None, # auto, always, never
     sysbuild: Optional[bool] = False, # --sysbuild or --no-sysbuild
     no_sysbuild: Optional[bool] = False,
-    cmake_opt: Optional[List[str]] = None # extra options after --
+    cmake_opt: Optional[List[str]] = None, # extra options after --
+    tail_lines: Optional[int] = None,
 ) -> Dict[str, Any]:
     """
     Builds a Zephyr application using the 'west build' command.
@@ -262,63 +1592,27 @@ def build_zephyr_project(
         sysbuild (bool, optional): Create multi domain build system.
         no_sysbuild (bool, optional): Do not create multi domain build system (default).
         cmake_opt (List[str], optional): Extra options to pass to cmake (after '--').
+        tail_lines (int, optional): Only return the last N lines of stdout and stderr.
 
     Returns:
         dict: Command execution result.
     """
-    command_args = ['build']
-
-    if board:
-        command_args.extend(['-b', board])
-    if build_dir:
-        command_args.extend(['-d', build_dir])
-    if force:
-        command_args.append('-f')
-    if cmake:
-        command_args.append('-c')
-    if cmake_only:
-        command_args.append('--cmake-only')
-    if domain:
-        command_args.extend(['--domain', domain])
-    if target:
-        command_args.extend(['-t', target])
-    if test_item:
-        command_args.extend(['-T', test_item])
-    if build_opt:
-        for opt in build_opt:
-            command_args.extend(['-o', opt])
-    if just_print:
-        command_args.append('-n')
-    if snippet:
-        for s in snippet:
-            command_args.extend(['-S', s])
-    if shield:
-        for s in shield:
-            command_args.extend(['--shield', s])
-    if extra_conf:
-        for f in extra_conf:
-            command_args.extend(['--extra-conf', f])
-    if extra_dtc_overlay:
-        for f in extra_dtc_overlay:
-            command_args.extend(['--extra-dtc-overlay', f])
-    if pristine:
-        command_args.extend(['-p', pristine])
-    if sysbuild:
-        command_args.append('--sysbuild')
-    if no_sysbuild:
-        command_args.append('--no-sysbuild')
-
-    command_args.append(source_dir)
-
-    if cmake_opt:
-        command_args.append('--')
-        command_args.extend(cmake_opt)
-
-    return run_west_command(command_args)
+    command_args = _apply_flags(['build'], _BUILD_FLAGS, locals())
+    command_args += (source_dir, '--', *cmake_opt) if cmake_opt else (source_dir,)
+
+    return await run_west_command(command_args, tail_lines=tail_lines,
+                                  on_line=_progress_reporter(_parse_ninja_progress))
 
 # --- MCP Tool for Runner-Based West Commands ---
-@mcp.tool()
-def run_west_runner(
+# Runner subcommands that keep running (GDB servers, RTT viewers, simulators);
+# they are started in the background instead of being waited on.
+_RUNNER_SUBCOMMANDS = ('flash', 'debug', 'debugserver', 'attach', 'rtt', 'robot', 'simulate')
+_VALID_RUNNER_SUB = frozenset(_RUNNER_SUBCOMMANDS)
+_INVALID_RUNNER_SUB_MESSAGE = f"Invalid subcommand. Must be one of: {', '.join(_RUNNER_SUBCOMMANDS)}."
+_BACKGROUND_RUNNER_SUBCOMMANDS = frozenset({'debugserver', 'rtt', 'simulate'})
+
+@_west_tool()
+async def run_west_runner(
     subcommand: str,
     build_dir: Optional[str] = None,
     runner: Optional[str] = None,
@@ -327,11 +1621,15 @@ def run_west_runner(
     board_dir: Optional[str] = None,
     gdb: Optional[str] = None,
     openocd: Optional[str] = None,
-    openocd_search: Optional[str] = None
+    openocd_search: Optional[str] = None,
+    tail_lines: Optional[int] = None,
 ) -> Dict[str, Any]:
     """
     A single tool to execute runner-based commands like `flash`, `debug`, `debugserver`, `attach`, `rtt`, `robot`, and `simulate`.
 
+    `debugserver`, `rtt` and `simulate` keep running until stopped, so they are
+    started in the background and the result carries their 'pid' instead of output.
+
     Args:
         subcommand (str): The runner-based subcommand to execute.
         build_dir (str, optional): Application build directory.
@@ -342,28 +1640,23 @@ def run_west_runner(
         gdb (str, optional): Path to GDB.
         openocd (str, optional): Path to OpenOCD.
         openocd_search (str, optional): Path to add to OpenOCD search path.
+        tail_lines (int, optional): Only return the last N lines of stdout and stderr.
+                                    Ignored for commands started in the background.
 
     Returns:
         dict: Command execution result.
     """
-    valid_subcommands = ['flash', 'debug', 'debugserver', 'attach', 'rtt', 'robot', 'simulate']
-    if subcommand not in valid_subcommands:
-        return {
-            "success": False,
-            "message": f"Invalid subcommand. Must be one of: {', '.join(valid_subcommands)}.",
-            "stdout": "",
-            "stderr": ""
-        }
+    if subcommand not in _VALID_RUNNER_SUB:
+        return WestResult(False, _INVALID_RUNNER_SUB_MESSAGE)
 
-    command_args = _add_runner_options(
-        [subcommand], build_dir, runner, skip_rebuild, domain,
-        board_dir, gdb, openocd, openocd_search
-    )
-    return run_west_command(command_args)
+    command_args = _apply_flags([subcommand], _RUNNER_FLAGS, locals())
+    if subcommand in _BACKGROUND_RUNNER_SUBCOMMANDS:
+        return await run_west_command(command_args, capture=False, timeout=0)
+    return await run_west_command(command_args, tail_lines=tail_lines)
 
 # --- MCP Tool for `west zephyr-export` ---
-@mcp.tool()
-def export_zephyr_installation() -> Dict[str, Any]:
+@_west_tool()
+async def export_zephyr_installation() -> Dict[str, Any]:
     """
     Registers the current Zephyr installation as a CMake config package
     in the CMake user package registry using 'west zephyr-export'.
@@ -372,11 +1665,28 @@ def export_zephyr_installation() -> Dict[str, Any]:
         dict: Command execution result.
     """
     command_args = ['zephyr-export']
-    return run_west_command(command_args)
+    return await run_west_command(command_args)
 
 # --- MCP Tool for `west blobs` ---
-@mcp.tool()
-def manage_blobs(
+_VALID_BLOB_SUB = frozenset({'list', 'fetch', 'clean'})
+_INVALID_BLOB_SUB_MESSAGE = f"Invalid 'blobs' subcommand. Must be one of: {', '.join(sorted(_VALID_BLOB_SUB))}."
+# Note: west blobs uses --module for filtering
+_BLOBS_FLAGS = {
+    'list': (
+        ('--module', 'module', 'list'),
+        ('-f', 'format_string', 'val'),
+    ),
+    'fetch': (
+        ('--module', 'module', 'list'),
+        ('-a', 'auto_accept', 'bool'),
+    ),
+    'clean': (
+        ('--module', 'module', 'list'),
+    ),
+}
+
+@_west_tool()
+async def manage_blobs(
     subcommand: str,
     module: Optional[List[str]] = None,
     format_string: Optional[str] = None,
@@ -394,28 +1704,18 @@ def manage_blobs(
     Returns:
         dict: Command execution result.
     """
-    if subcommand not in ['list', 'fetch', 'clean']:
-        return {
-            "success": False,
-            "message": "Invalid 'blobs' subcommand. Must be one of: list, fetch, clean.",
-            "stdout": "",
-            "stderr": ""
-        }
+    if subcommand not in _VALID_BLOB_SUB:
+        return WestResult(False, _INVALID_BLOB_SUB_MESSAGE)
 
-    command_args = ['blobs', subcommand]
-    if module:
-        for m in module:
-            command_args.extend(['--module', m]) # Note: west blobs uses --module for filtering
-    if subcommand == 'list' and format_string:
-        command_args.extend(['-f', format_string])
-    if subcommand == 'fetch' and auto_accept:
-        command_args.append('-a')
-
-    return run_west_command(command_args)
+    command_args = _apply_flags(['blobs', subcommand], _BLOBS_FLAGS[subcommand], locals())
+    return await run_west_command(command_args)
 
 # --- MCP Tool for `west bindesc` ---
-@mcp.tool()
-def manage_binary_descriptors(
+_VALID_BINDESC_SUB = frozenset({'dump', 'search', 'custom_search', 'list', 'get_offset'})
+_INVALID_BINDESC_SUB_MESSAGE = f"Invalid 'bindesc' subcommand. Must be one of: {', '.join(sorted(_VALID_BINDESC_SUB))}."
+
+@_west_tool()
+async def manage_binary_descriptors(
     subcommand: str,
     args: Optional[List[str]] = None
 ) -> Dict[str, Any]:
@@ -429,25 +1729,25 @@ def manage_binary_descriptors(
     Returns:
         dict: Command execution result.
     """
-    valid_subcommands = ['dump', 'search', 'custom_search', 'list', 'get_offset']
-    if subcommand not in valid_subcommands:
-        return {
-            "success": False,
-            "message": f"Invalid 'bindesc' subcommand. Must be one of: {', '.join(valid_subcommands)}.",
-            "stdout": "",
-            "stderr": ""
-        }
+    if subcommand not in _VALID_BINDESC_SUB:
+        return WestResult(False, _INVALID_BINDESC_SUB_MESSAGE)
 
     command_args = ['bindesc', subcommand]
     if args:
         command_args.extend(args)
-    return run_west_command(command_args)
+    return await run_west_command(command_args)
 
 
 
 # --- MCP Tool for `west packages` ---
-@mcp.tool()
-def manage_packages(
+_VALID_PKG_MGRS = frozenset({'pip'}) # Extend this set if other managers are supported by west packages
+_INVALID_PKG_MGR_MESSAGE = f"Invalid package manager. Must be one of: {', '.join(sorted(_VALID_PKG_MGRS))}."
+_PACKAGES_FLAGS = (
+    ('-m', 'module', 'list'),
+)
+
+@_west_tool()
+async def manage_packages(
     manager: str,
     module: Optional[List[str]] = None,
     args: Optional[List[str]] = None
@@ -464,25 +1764,27 @@ def manage_packages(
     Returns:
         dict: Command execution result.
     """
-    if manager not in ['pip']: # Extend this list if other managers are supported by west packages
-        return {
-            "success": False,
-            "message": f"Invalid package manager. Only '{manager}' is currently supported for 'west packages'.",
-            "stdout": "",
-            "stderr": ""
-        }
+    if manager not in _VALID_PKG_MGRS:
+        return WestResult(False, _INVALID_PKG_MGR_MESSAGE)
 
-    command_args = ['packages', manager]
-    if module:
-        for m in module:
-            command_args.extend(['-m', m])
+    command_args = _apply_flags(['packages', manager], _PACKAGES_FLAGS, locals())
     if args:
         command_args.extend(args)
-    return run_west_command(command_args)
+    return await run_west_command(command_args)
 
 # --- MCP Tool for `west patch` ---
-@mcp.tool()
-def manage_patches(
+_VALID_PATCH_SUB = frozenset({'apply', 'clean', 'gh-fetch', 'list'})
+_INVALID_PATCH_SUB_MESSAGE = f"Invalid 'patch' subcommand. Must be one of: {', '.join(sorted(_VALID_PATCH_SUB))}."
+_PATCH_FLAGS = (
+    ('-b', 'patch_base', 'val'),
+    ('-l', 'patch_yml', 'val'),
+    ('-w', 'west_workspace', 'val'),
+    ('-sm', 'src_module', 'val'),
+    ('-dm', 'dst_module', 'list'),
+)
+
+@_west_tool()
+async def manage_patches(
     subcommand: str,
     patch_base: Optional[str] = None,
     patch_yml: Optional[str] = None,
@@ -506,35 +1808,17 @@ def manage_patches(
     Returns:
         dict: Command execution result.
     """
-    valid_subcommands = ['apply', 'clean', 'gh-fetch', 'list']
-    if subcommand not in valid_subcommands:
-        return {
-            "success": False,
-            "message": f"Invalid 'patch' subcommand. Must be one of: {', '.join(valid_subcommands)}.",
-            "stdout": "",
-            "stderr": ""
-        }
+    if subcommand not in _VALID_PATCH_SUB:
+        return WestResult(False, _INVALID_PATCH_SUB_MESSAGE)
 
-    command_args = ['patch', subcommand]
-    if patch_base:
-        command_args.extend(['-b', patch_base])
-    if patch_yml:
-        command_args.extend(['-l', patch_yml])
-    if west_workspace:
-        command_args.extend(['-w', west_workspace])
-    if src_module:
-        command_args.extend(['-sm', src_module])
-    if dst_module:
-        for m in dst_module:
-            command_args.extend(['-dm', m])
+    command_args = _apply_flags(['patch', subcommand], _PATCH_FLAGS, locals())
     if args:
         command_args.extend(args)
-
-    return run_west_command(command_args)
+    return await run_west_command(command_args)
 
 # --- MCP Tool for `west gtags` ---
-@mcp.tool()
-def index_gtags(
+@_west_tool()
+async def index_gtags(
     projects: Optional[List[str]] = None
 ) -> Dict[str, Any]:
     """
@@ -551,11 +1835,20 @@ def index_gtags(
     command_args = ['gtags']
     if projects:
         command_args.extend(projects)
-    return run_west_command(command_args)
+    return await run_west_command(command_args)
 
 # --- MCP Tool for `west init` ---
-@mcp.tool()
-def init_workspace(
+_INIT_FLAGS = (
+    ('-m', 'manifest_url', 'val'),
+    ('--mr', 'manifest_rev', 'val'),
+    ('--mf', 'manifest_file', 'val'),
+    ('-o', 'clone_opt', 'list'),
+    ('-l', 'local', 'bool'),
+    ('--rename-delay', 'rename_delay', 'int'),
+)
+
+@_west_tool()
+async def init_workspace(
     directory: Optional[str] = None,
     manifest_url: Optional[str] = None,
     manifest_rev: Optional[str] = None,
@@ -579,27 +1872,27 @@ def init_workspace(
     Returns:
         dict: Command execution result.
     """
-    command_args = ['init']
-    if manifest_url:
-        command_args.extend(['-m', manifest_url])
-    if manifest_rev:
-        command_args.extend(['--mr', manifest_rev])
-    if manifest_file:
-        command_args.extend(['--mf', manifest_file])
-    if clone_opt:
-        for opt in clone_opt:
-            command_args.extend(['-o', opt])
-    if local:
-        command_args.append('-l')
-    if rename_delay:
-        command_args.extend(['--rename-delay', str(rename_delay)])
+    command_args = _apply_flags(['init'], _INIT_FLAGS, locals())
     if directory:
         command_args.append(directory)
-    return run_west_command(command_args)
+    return await run_west_command(command_args)
 
 # --- MCP Tool for `west update` ---
-@mcp.tool()
-def update_workspace(
+_UPDATE_FLAGS = (
+    ('--stats', 'stats', 'bool'),
+    ('--name-cache', 'name_cache', 'val'),
+    ('--path-cache', 'path_cache', 'val'),
+    ('-f', 'fetch', 'val'),
+    ('-o', 'fetch_opt', 'list'),
+    ('-n', 'narrow', 'bool'),
+    ('-k', 'keep_descendants', 'bool'),
+    ('-r', 'rebase', 'bool'),
+    ('--group-filter', 'group_filter', 'val'),
+    ('--submodule-init-config', 'submodule_init_config', 'list'),
+)
+
+@_west_tool()
+async def update_workspace(
     projects: Optional[List[str]] = None,
     stats: bool = False,
     name_cache: Optional[str] = None,
@@ -611,6 +1904,7 @@ def update_workspace(
     rebase: bool = False,
     group_filter: Optional[str] = None,
     submodule_init_config: Optional[List[str]] = None,
+    tail_lines: Optional[int] = None,
 ) -> Dict[str, Any]:
     """
     Updates active projects defined in the manifest file.
@@ -627,42 +1921,32 @@ def update_workspace(
         rebase (bool, optional): Rebase checked out branches.
         group_filter (str, optional): Filter projects by group.
         submodule_init_config (List[str], optional): Git config for submodule init.
+        tail_lines (int, optional): Only return the last N lines of stdout and stderr.
 
     Returns:
         dict: Command execution result.
     """
-    command_args = ['update']
-    if stats:
-        command_args.append('--stats')
-    if name_cache:
-        command_args.extend(['--name-cache', name_cache])
-    if path_cache:
-        command_args.extend(['--path-cache', path_cache])
-    if fetch:
-        command_args.extend(['-f', fetch])
-    if fetch_opt:
-        for opt in fetch_opt:
-            command_args.extend(['-o', opt])
-    if narrow:
-        command_args.append('-n')
-    if keep_descendants:
-        command_args.append('-k')
-    if rebase:
-        command_args.append('-r')
-    if group_filter:
-        command_args.extend(['--group-filter', group_filter])
-    if submodule_init_config:
-        for config in submodule_init_config:
-            command_args.extend(['--submodule-init-config', config])
+    command_args = _apply_flags(['update'], _UPDATE_FLAGS, locals())
     if projects:
         command_args.extend(projects)
-    return run_west_command(command_args)
+    on_line = _progress_reporter(_update_progress_parser(len(projects) if projects else None))
+    return await run_west_command(command_args, tail_lines=tail_lines, on_line=on_line)
 
 
 
 # --- MCP Tool for `west manifest` ---
-@mcp.tool()
-def manage_manifest(
+_MANIFEST_FLAGS = (
+    ('--resolve', 'resolve', 'bool'),
+    ('--freeze', 'freeze', 'bool'),
+    ('--validate', 'validate', 'bool'),
+    ('--path', 'path', 'bool'),
+    ('--untracked', 'untracked', 'bool'),
+    ('-o', 'out', 'val'),
+    ('--active-only', 'active_only', 'bool'),
+)
+
+@_west_tool()
+async def manage_manifest(
     resolve: bool = False,
     freeze: bool = False,
     validate: bool = False,
@@ -686,26 +1970,19 @@ def manage_manifest(
     Returns:
         dict: Command execution result.
     """
-    command_args = ['manifest']
-    if resolve:
-        command_args.append('--resolve')
-    if freeze:
-        command_args.append('--freeze')
-    if validate:
-        command_args.append('--validate')
-    if path:
-        command_args.append('--path')
-    if untracked:
-        command_args.append('--untracked')
-    if out:
-        command_args.extend(['-o', out])
-    if active_only:
-        command_args.append('--active-only')
-    return run_west_command(command_args)
+    command_args = _apply_flags(['manifest'], _MANIFEST_FLAGS, locals())
+    return await run_west_command(command_args)
 
 # --- MCP Tool for `west compare` ---
-@mcp.tool()
-def compare_projects(
+_COMPARE_FLAGS = (
+    ('-a', 'all', 'bool'),
+    ('--exit-code', 'exit_code', 'bool'),
+    ('--ignore-branches', 'ignore_branches', 'bool'),
+    ('--no-ignore-branches', 'no_ignore_branches', 'bool'),
+)
+
+@_west_tool()
+async def compare_projects(
     projects: Optional[List[str]] = None,
     all: bool = False,
     exit_code: bool = False,
@@ -723,24 +2000,24 @@ def compare_projects(
         no_ignore_branches (bool, optional): Don't ignore branches.
 
     Returns:
-        dict: Command execution result.
+        dict: Command execution result. With several projects, each one is
+              compared concurrently and its output follows a '=== project ===' header.
     """
-    command_args = ['compare']
-    if all:
-        command_args.append('-a')
-    if exit_code:
-        command_args.append('--exit-code')
-    if ignore_branches:
-        command_args.append('--ignore-branches')
-    if no_ignore_branches:
-        command_args.append('--no-ignore-branches')
+    command_args = _apply_flags(['compare'], _COMPARE_FLAGS, locals())
+    if projects and len(projects) > 1:
+        return await _fan_out(lambda project: [*command_args, project], projects)
     if projects:
         command_args.extend(projects)
-    return run_west_command(command_args)
+    return await run_west_command(command_args)
 
 # --- MCP Tool for `west diff` ---
-@mcp.tool()
-def diff_projects(
+_DIFF_FLAGS = (
+    ('-a', 'all', 'bool'),
+    ('-m', 'manifest', 'bool'),
+)
+
+@_west_tool()
+async def diff_projects(
     projects: Optional[List[str]] = None,
     all: bool = False,
     manifest: bool = False,
@@ -756,23 +2033,25 @@ def diff_projects(
         git_diff_args (List[str], optional): Arguments to pass to 'git diff'.
 
     Returns:
-        dict: Command execution result.
+        dict: Command execution result. With several projects, each one is
+              diffed concurrently and its output follows a '=== project ===' header.
     """
-    command_args = ['diff']
-    if all:
-        command_args.append('-a')
-    if manifest:
-        command_args.append('-m')
+    command_args = _apply_flags(['diff'], _DIFF_FLAGS, locals())
+    git_args = ('--', *git_diff_args) if git_diff_args else ()
+    if projects and len(projects) > 1:
+        return await _fan_out(lambda project: [*command_args, project, *git_args], projects)
     if projects:
         command_args.extend(projects)
-    if git_diff_args:
-        command_args.append('--')
-        command_args.extend(git_diff_args)
-    return run_west_command(command_args)
+    command_args.extend(git_args)
+    return await run_west_command(command_args)
 
 # --- MCP Tool for `west status` ---
-@mcp.tool()
-def status_projects(
+_STATUS_FLAGS = (
+    ('-a', 'all', 'bool'),
+)
+
+@_west_tool()
+async def status_projects(
     projects: Optional[List[str]] = None,
     all: bool = False,
     git_status_args: Optional[List[str]] = None,
@@ -786,21 +2065,27 @@ def status_projects(
         git_status_args (List[str], optional): Arguments to pass to 'git status'.
 
     Returns:
-        dict: Command execution result.
+        dict: Command execution result. With several projects, each one is
+              checked concurrently and its output follows a '=== project ===' header.
     """
-    command_args = ['status']
-    if all:
-        command_args.append('-a')
+    command_args = _apply_flags(['status'], _STATUS_FLAGS, locals())
+    git_args = ('--', *git_status_args) if git_status_args else ()
+    if projects and len(projects) > 1:
+        return await _fan_out(lambda project: [*command_args, project, *git_args], projects)
     if projects:
         command_args.extend(projects)
-    if git_status_args:
-        command_args.append('--')
-        command_args.extend(git_status_args)
-    return run_west_command(command_args)
+    command_args.extend(git_args)
+    return await run_west_command(command_args)
 
 # --- MCP Tool for `west forall` ---
-@mcp.tool()
-def forall_projects(
+_FORALL_FLAGS = (
+    ('-C', 'cwd', 'val'),
+    ('-a', 'all', 'bool'),
+    ('-g', 'group', 'list'),
+)
+
+@_west_tool()
+async def forall_projects(
     command: str,
     projects: Optional[List[str]] = None,
     cwd: Optional[str] = None,
@@ -818,23 +2103,25 @@ def forall_projects(
         group (List[str], optional): Only run on projects in these groups.
 
     Returns:
-        dict: Command execution result.
+        dict: Command execution result. With several projects, the command runs
+              in each of them concurrently and each project's output follows a
+              '=== project ===' header.
     """
-    command_args = ['forall', '-c', command]
-    if cwd:
-        command_args.extend(['-C', cwd])
-    if all:
-        command_args.append('-a')
-    if group:
-        for g in group:
-            command_args.extend(['-g', g])
+    command_args = _apply_flags(['forall', '-c', command], _FORALL_FLAGS, locals())
+    if projects and len(projects) > 1:
+        return await _fan_out(lambda project: [*command_args, project], projects)
     if projects:
         command_args.extend(projects)
-    return run_west_command(command_args)
+    return await run_west_command(command_args)
 
 # --- MCP Tool for `west grep` ---
-@mcp.tool()
-def grep_projects(
+_GREP_FLAGS = (
+    ('--tool', 'tool', 'val'),
+    ('--tool-path', 'tool_path', 'val'),
+)
+
+@_west_tool()
+async def grep_projects(
     pattern: str,
     projects: Optional[List[str]] = None,
     tool: Optional[str] = None,
@@ -852,25 +2139,28 @@ def grep_projects(
         grep_args (List[str], optional): Arguments to pass to the grep tool.
 
     Returns:
-        dict: Command execution result.
+        dict: Command execution result. With several projects, each one is
+              searched concurrently and its output follows a '=== project ===' header.
     """
-    command_args = ['grep']
-    if tool:
-        command_args.extend(['--tool', tool])
-    if tool_path:
-        command_args.extend(['--tool-path', tool_path])
+    command_args = _apply_flags(['grep'], _GREP_FLAGS, locals())
+    pattern_args = (pattern, '--', *grep_args) if grep_args else (pattern,)
+    if projects and len(projects) > 1:
+        return await _fan_out(lambda project: [*command_args, '-p', project, *pattern_args], projects)
     if projects:
-        for p in projects:
-            command_args.extend(['-p', p])
-    command_args.append(pattern)
-    if grep_args:
-        command_args.append('--')
-        command_args.extend(grep_args)
-    return run_west_command(command_args)
+        command_args += ('-p', projects[0])
+    command_args += pattern_args
+    return await run_west_command(command_args)
 
 # --- MCP Tool for `west config` ---
-@mcp.tool()
-def manage_config(
+_CONFIG_FLAGS = (
+    ('-l', 'list', 'bool'),
+    ('-d', 'delete', 'bool'),
+    ('-D', 'delete_all', 'bool'),
+    ('-a', 'append', 'bool'),
+)
+
+@_west_tool()
+async def manage_config(
     name: Optional[str] = None,
     value: Optional[str] = None,
     list: bool = False,
@@ -894,28 +2184,149 @@ def manage_config(
     Returns:
         dict: Command execution result.
     """
-    command_args = ['config']
-    if list:
-        command_args.append('-l')
-    if delete:
-        command_args.append('-d')
-    if delete_all:
-        command_args.append('-D')
-    if append:
-        command_args.append('-a')
-    if scope:
-        command_args.append(f'--{scope}')
-    if name:
-        command_args.append(name)
-    if value:
-        command_args.append(value)
-    return run_west_command(command_args)
+    command_args = _apply_flags(['config'], _CONFIG_FLAGS, locals())
+    command_args += [arg for arg in (scope and f'--{scope}', name, value) if arg]
+    return await run_west_command(command_args)
 
 
 
 # --- MCP Tool for `west twister` ---
-@mcp.tool()
-def run_twister(
+_TWISTER_FLAGS = (
+    ('-E', 'save_tests', 'val'),
+    ('-F', 'load_tests', 'val'),
+    ('-T', 'testsuite_root', 'list'),
+    ('-f', 'only_failed', 'bool'),
+    ('--list-tests', 'list_tests', 'bool'),
+    ('--test-tree', 'test_tree', 'bool'),
+    ('-G', 'integration', 'bool'),
+    ('--emulation-only', 'emulation_only', 'bool'),
+    ('--device-testing', 'device_testing', 'bool'),
+    ('--generate-hardware-map', 'generate_hardware_map', 'val'),
+    ('--simulation', 'simulation', 'val'),
+    ('--device-serial', 'device_serial', 'val'),
+    ('--device-serial-pty', 'device_serial_pty', 'val'),
+    ('--hardware-map', 'hardware_map', 'val'),
+    ('--device-flash-timeout', 'device_flash_timeout', 'int'),
+    ('--device-flash-with-test', 'device_flash_with_test', 'bool'),
+    ('--flash-before', 'flash_before', 'bool'),
+    ('-b', 'build_only', 'bool'),
+    ('--prep-artifacts-for-testing', 'prep_artifacts_for_testing', 'bool'),
+    ('--package-artifacts', 'package_artifacts', 'val'),
+    ('--test-only', 'test_only', 'bool'),
+    ('--timeout-multiplier', 'timeout_multiplier', 'int'),
+    ('--test-pattern', 'test_pattern', 'val'),
+    ('-s', 'test', 'list'),
+    ('--sub-test', 'sub_test', 'val'),
+    ('--pytest-args', 'pytest_args', 'val'),
+    ('--ctest-args', 'ctest_args', 'val'),
+    ('--enable-valgrind', 'enable_valgrind', 'bool'),
+    ('--enable-asan', 'enable_asan', 'bool'),
+    ('-A', 'board_root', 'list'),
+    ('--allow-installed-plugin', 'allow_installed_plugin', 'bool'),
+    ('-a', 'arch', 'val'),
+    ('-B', 'subset', 'val'),
+    ('--shuffle-tests', 'shuffle_tests', 'bool'),
+    ('--shuffle-tests-seed', 'shuffle_tests_seed', 'int'),
+    ('-c', 'clobber_output', 'bool'),
+    ('--cmake-only', 'cmake_only', 'bool'),
+    ('--enable-coverage', 'enable_coverage', 'bool'),
+    ('-C', 'coverage', 'bool'),
+    ('--gcov-tool', 'gcov_tool', 'val'),
+    ('--coverage-basedir', 'coverage_basedir', 'val'),
+    ('--coverage-platform', 'coverage_platform', 'val'),
+    ('--coverage-tool', 'coverage_tool', 'val'),
+    ('--coverage-formats', 'coverage_formats', 'val'),
+    ('--coverage-per-instance', 'coverage_per_instance', 'bool'),
+    ('--disable-coverage-aggregation', 'disable_coverage_aggregation', 'bool'),
+    ('--test-config', 'test_config', 'val'),
+    ('--level', 'level', 'int'),
+    ('--device-serial-baud', 'device_serial_baud', 'int'),
+    ('--disable-suite-name-check', 'disable_suite_name_check', 'bool'),
+    ('-e', 'exclude_tag', 'val'),
+    ('--enable-lsan', 'enable_lsan', 'bool'),
+    ('--enable-ubsan', 'enable_ubsan', 'bool'),
+    ('--filter', 'filter', 'val'),
+    ('--force-color', 'force_color', 'bool'),
+    ('--force-toolchain', 'force_toolchain', 'bool'),
+    ('--create-rom-ram-report', 'create_rom_ram_report', 'bool'),
+    ('--footprint-report', 'footprint_report', 'val'),
+    ('--enable-size-report', 'enable_size_report', 'bool'),
+    ('--footprint-from-buildlog', 'footprint_from_buildlog', 'bool'),
+    ('-m', 'last_metrics', 'bool'),
+    ('--compare-report', 'compare_report', 'val'),
+    ('--show-footprint', 'show_footprint', 'bool'),
+    ('-H', 'footprint_threshold', 'int'),
+    ('-D', 'all_deltas', 'bool'),
+    ('-z', 'size', 'val'),
+    ('-i', 'inline_logs', 'bool'),
+    ('--ignore-platform-key', 'ignore_platform_key', 'bool'),
+    ('-j', 'jobs', 'int'),
+    ('-K', 'force_platform', 'bool'),
+    ('-l', 'all', 'bool'),
+    ('--list-tags', 'list_tags', 'bool'),
+    ('--log-file', 'log_file', 'val'),
+    ('-M', 'runtime_artifact_cleanup', 'val'),
+    ('--keep-artifacts', 'keep_artifacts', 'val'),
+    ('-N', 'ninja', 'bool'),
+    ('-k', 'make', 'bool'),
+    ('-n', 'no_clean', 'bool'),
+    ('--aggressive-no-clean', 'aggressive_no_clean', 'bool'),
+    ('--detailed-test-id', 'detailed_test_id', 'bool'),
+    ('--no-detailed-test-id', 'no_detailed_test_id', 'bool'),
+    ('--detailed-skipped-report', 'detailed_skipped_report', 'bool'),
+    ('-O', 'outdir', 'val'),
+    ('-o', 'report_dir', 'val'),
+    ('--overflow-as-errors', 'overflow_as_errors', 'bool'),
+    ('--report-filtered', 'report_filtered', 'bool'),
+    ('-P', 'exclude_platform', 'val'),
+    ('--persistent-hardware-map', 'persistent_hardware_map', 'bool'),
+    ('--vendor', 'vendor', 'val'),
+    ('-p', 'platform', 'val'),
+    ('--platform-pattern', 'platform_pattern', 'val'),
+    ('--platform-reports', 'platform_reports', 'bool'),
+    ('--pre-script', 'pre_script', 'val'),
+    ('--quarantine-list', 'quarantine_list', 'val'),
+    ('--quarantine-verify', 'quarantine_verify', 'bool'),
+    ('--quit-on-failure', 'quit_on_failure', 'bool'),
+    ('--report-name', 'report_name', 'val'),
+    ('--report-summary', 'report_summary', 'int'),
+    ('--report-suffix', 'report_suffix', 'val'),
+    ('--report-all-options', 'report_all_options', 'bool'),
+    ('--retry-failed', 'retry_failed', 'int'),
+    ('--retry-interval', 'retry_interval', 'int'),
+    ('--retry-build-errors', 'retry_build_errors', 'bool'),
+    ('-S', 'enable_slow', 'bool'),
+    ('--enable-slow-only', 'enable_slow_only', 'bool'),
+    ('--seed', 'seed', 'int'),
+    ('--short-build-path', 'short_build_path', 'bool'),
+    ('-t', 'tag', 'val'),
+    ('--timestamps', 'timestamps', 'bool'),
+    ('-u', 'no_update', 'bool'),
+    ('-v', 'verbose', 'bool'),
+    ('-ll', 'log_level', 'val'),
+    ('-W', 'disable_warnings_as_errors', 'bool'),
+    ('--west-flash', 'west_flash', 'val'),
+    ('--west-runner', 'west_runner', 'val'),
+    ('-X', 'fixture', 'val'),
+    ('-x', 'extra_args', 'val'),
+    ('-y', 'dry_run', 'bool'),
+    ('--alt-config-root', 'alt_config_root', 'val'),
+)
+
+# Parameters for options in the same mutually exclusive group of twister's
+# parser, or that cancel each other out.
+_TWISTER_CONFLICTS = (
+    ('build_only', 'test_only'),
+    ('test', 'sub_test'),
+    ('ninja', 'make'),
+    ('enable_valgrind', 'enable_asan'),
+    ('emulation_only', 'integration'),
+    ('device_serial', 'device_serial_pty', 'hardware_map'),
+    ('detailed_test_id', 'no_detailed_test_id'),
+)
+
+@_west_tool()
+async def run_twister(
     extra_test_args: Optional[List[str]] = None,
     save_tests: Optional[str] = None,
     load_tests: Optional[str] = None,
@@ -1036,260 +2447,44 @@ def run_twister(
     extra_args: Optional[str] = None,
     dry_run: bool = False,
     alt_config_root: Optional[str] = None,
+    tail_lines: Optional[int] = None,
 ) -> Dict[str, Any]:
     """
     Runs twister, the Zephyr test runner.
+
+    Twister writes its complete log to twister.log in the output directory
+    (or to 'log_file'), so 'tail_lines' can keep the returned output short
+    on long runs.
     """
-    command_args = ['twister']
-    if save_tests:
-        command_args.extend(['-E', save_tests])
-    if load_tests:
-        command_args.extend(['-F', load_tests])
-    if testsuite_root:
-        for root in testsuite_root:
-            command_args.extend(['-T', root])
-    if only_failed:
-        command_args.append('-f')
-    if list_tests:
-        command_args.append('--list-tests')
-    if test_tree:
-        command_args.append('--test-tree')
-    if integration:
-        command_args.append('-G')
-    if emulation_only:
-        command_args.append('--emulation-only')
-    if device_testing:
-        command_args.append('--device-testing')
-    if generate_hardware_map:
-        command_args.extend(['--generate-hardware-map', generate_hardware_map])
-    if simulation:
-        command_args.extend(['--simulation', simulation])
-    if device_serial:
-        command_args.extend(['--device-serial', device_serial])
-    if device_serial_pty:
-        command_args.extend(['--device-serial-pty', device_serial_pty])
-    if hardware_map:
-        command_args.extend(['--hardware-map', hardware_map])
-    if device_flash_timeout:
-        command_args.extend(['--device-flash-timeout', str(device_flash_timeout)])
-    if device_flash_with_test:
-        command_args.append('--device-flash-with-test')
-    if flash_before:
-        command_args.append('--flash-before')
-    if build_only:
-        command_args.append('-b')
-    if prep_artifacts_for_testing:
-        command_args.append('--prep-artifacts-for-testing')
-    if package_artifacts:
-        command_args.extend(['--package-artifacts', package_artifacts])
-    if test_only:
-        command_args.append('--test-only')
-    if timeout_multiplier:
-        command_args.extend(['--timeout-multiplier', str(timeout_multiplier)])
-    if test_pattern:
-        command_args.extend(['--test-pattern', test_pattern])
-    if test:
-        for t in test:
-            command_args.extend(['-s', t])
-    if sub_test:
-        command_args.extend(['--sub-test', sub_test])
-    if pytest_args:
-        command_args.extend(['--pytest-args', pytest_args])
-    if ctest_args:
-        command_args.extend(['--ctest-args', ctest_args])
-    if enable_valgrind:
-        command_args.append('--enable-valgrind')
-    if enable_asan:
-        command_args.append('--enable-asan')
-    if board_root:
-        for root in board_root:
-            command_args.extend(['-A', root])
-    if allow_installed_plugin:
-        command_args.append('--allow-installed-plugin')
-    if arch:
-        command_args.extend(['-a', arch])
-    if subset:
-        command_args.extend(['-B', subset])
-    if shuffle_tests:
-        command_args.append('--shuffle-tests')
-    if shuffle_tests_seed:
-        command_args.extend(['--shuffle-tests-seed', str(shuffle_tests_seed)])
-    if clobber_output:
-        command_args.append('-c')
-    if cmake_only:
-        command_args.append('--cmake-only')
-    if enable_coverage:
-        command_args.append('--enable-coverage')
-    if coverage:
-        command_args.append('-C')
-    if gcov_tool:
-        command_args.extend(['--gcov-tool', gcov_tool])
-    if coverage_basedir:
-        command_args.extend(['--coverage-basedir', coverage_basedir])
-    if coverage_platform:
-        command_args.extend(['--coverage-platform', coverage_platform])
-    if coverage_tool:
-        command_args.extend(['--coverage-tool', coverage_tool])
-    if coverage_formats:
-        command_args.extend(['--coverage-formats', coverage_formats])
-    if coverage_per_instance:
-        command_args.append('--coverage-per-instance')
-    if disable_coverage_aggregation:
-        command_args.append('--disable-coverage-aggregation')
-    if test_config:
-        command_args.extend(['--test-config', test_config])
-    if level:
-        command_args.extend(['--level', str(level)])
-    if device_serial_baud:
-        command_args.extend(['--device-serial-baud', str(device_serial_baud)])
-    if disable_suite_name_check:
-        command_args.append('--disable-suite-name-check')
-    if exclude_tag:
-        command_args.extend(['-e', exclude_tag])
-    if enable_lsan:
-        command_args.append('--enable-lsan')
-    if enable_ubsan:
-        command_args.append('--enable-ubsan')
-    if filter:
-        command_args.extend(['--filter', filter])
-    if force_color:
-        command_args.append('--force-color')
-    if force_toolchain:
-        command_args.append('--force-toolchain')
-    if create_rom_ram_report:
-        command_args.append('--create-rom-ram-report')
-    if footprint_report:
-        command_args.extend(['--footprint-report', footprint_report])
-    if enable_size_report:
-        command_args.append('--enable-size-report')
-    if footprint_from_buildlog:
-        command_args.append('--footprint-from-buildlog')
-    if last_metrics:
-        command_args.append('-m')
-    if compare_report:
-        command_args.extend(['--compare-report', compare_report])
-    if show_footprint:
-        command_args.append('--show-footprint')
-    if footprint_threshold:
-        command_args.extend(['-H', str(footprint_threshold)])
-    if all_deltas:
-        command_args.append('-D')
-    if size:
-        command_args.extend(['-z', size])
-    if inline_logs:
-        command_args.append('-i')
-    if ignore_platform_key:
-        command_args.append('--ignore-platform-key')
-    if jobs:
-        command_args.extend(['-j', str(jobs)])
-    if force_platform:
-        command_args.append('-K')
-    if all:
-        command_args.append('-l')
-    if list_tags:
-        command_args.append('--list-tags')
-    if log_file:
-        command_args.extend(['--log-file', log_file])
-    if runtime_artifact_cleanup:
-        command_args.extend(['-M', runtime_artifact_cleanup])
-    if keep_artifacts:
-        command_args.extend(['--keep-artifacts', keep_artifacts])
-    if ninja:
-        command_args.append('-N')
-    if make:
-        command_args.append('-k')
-    if no_clean:
-        command_args.append('-n')
-    if aggressive_no_clean:
-        command_args.append('--aggressive-no-clean')
-    if detailed_test_id:
-        command_args.append('--detailed-test-id')
-    if no_detailed_test_id:
-        command_args.append('--no-detailed-test-id')
-    if detailed_skipped_report:
-        command_args.append('--detailed-skipped-report')
-    if outdir:
-        command_args.extend(['-O', outdir])
-    if report_dir:
-        command_args.extend(['-o', report_dir])
-    if overflow_as_errors:
-        command_args.append('--overflow-as-errors')
-    if report_filtered:
-        command_args.append('--report-filtered')
-    if exclude_platform:
-        command_args.extend(['-P', exclude_platform])
-    if persistent_hardware_map:
-        command_args.append('--persistent-hardware-map')
-    if vendor:
-        command_args.extend(['--vendor', vendor])
-    if platform:
-        command_args.extend(['-p', platform])
-    if platform_pattern:
-        command_args.extend(['--platform-pattern', platform_pattern])
-    if platform_reports:
-        command_args.append('--platform-reports')
-    if pre_script:
-        command_args.extend(['--pre-script', pre_script])
-    if quarantine_list:
-        command_args.extend(['--quarantine-list', quarantine_list])
-    if quarantine_verify:
-        command_args.append('--quarantine-verify')
-    if quit_on_failure:
-        command_args.append('--quit-on-failure')
-    if report_name:
-        command_args.extend(['--report-name', report_name])
-    if report_summary:
-        command_args.extend(['--report-summary', str(report_summary)])
-    if report_suffix:
-        command_args.extend(['--report-suffix', report_suffix])
-    if report_all_options:
-        command_args.append('--report-all-options')
-    if retry_failed:
-        command_args.extend(['--retry-failed', str(retry_failed)])
-    if retry_interval:
-        command_args.extend(['--retry-interval', str(retry_interval)])
-    if retry_build_errors:
-        command_args.append('--retry-build-errors')
-    if enable_slow:
-        command_args.append('-S')
-    if enable_slow_only:
-        command_args.append('--enable-slow-only')
-    if seed:
-        command_args.extend(['--seed', str(seed)])
-    if short_build_path:
-        command_args.append('--short-build-path')
-    if tag:
-        command_args.extend(['-t', tag])
-    if timestamps:
-        command_args.append('--timestamps')
-    if no_update:
-        command_args.append('-u')
-    if verbose:
-        command_args.append('-v')
-    if log_level:
-        command_args.extend(['-ll', log_level])
-    if disable_warnings_as_errors:
-        command_args.append('-W')
-    if west_flash:
-        command_args.extend(['--west-flash', west_flash])
-    if west_runner:
-        command_args.extend(['--west-runner', west_runner])
-    if fixture:
-        command_args.extend(['-X', fixture])
-    if extra_args:
-        command_args.extend(['-x', extra_args])
-    if dry_run:
-        command_args.append('-y')
-    if alt_config_root:
-        command_args.extend(['--alt-config-root', alt_config_root])
+    conflict = _find_conflict(_TWISTER_CONFLICTS, locals())
+    if conflict:
+        return conflict
+    command_args = _apply_flags(['twister'], _TWISTER_FLAGS, locals())
     if extra_test_args:
-        command_args.append('--')
-        command_args.extend(extra_test_args)
-    return run_west_command(command_args)
+        command_args += ('--', *extra_test_args)
+    return await run_west_command(command_args, tail_lines=tail_lines)
 
 # --- MCP Tool for `west sign` ---
-@mcp.tool()
-def sign_binary(
+_SIGN_FLAGS = (
+    ('-d', 'build_dir', 'val'),
+    ('-q', 'quiet', 'bool'),
+    ('-f', 'force', 'bool'),
+    ('-t', 'tool', 'val'),
+    ('-p', 'tool_path', 'val'),
+    ('-D', 'tool_data', 'val'),
+    ('--if-tool-available', 'if_tool_available', 'bool'),
+    ('--bin', 'bin', 'bool'),
+    ('--no-bin', 'no_bin', 'bool'),
+    ('-B', 'sbin', 'val'),
+    ('--hex', 'hex', 'bool'),
+    ('--no-hex', 'no_hex', 'bool'),
+    ('-H', 'shex', 'val'),
+)
+
+_SIGN_CONFLICTS = (('bin', 'no_bin'), ('hex', 'no_hex'))
+
+@_west_tool()
+async def sign_binary(
     build_dir: Optional[str] = None,
     quiet: bool = False,
     force: bool = False,
@@ -1308,41 +2503,27 @@ def sign_binary(
     """
     Signs a Zephyr binary.
     """
-    command_args = ['sign']
-    if build_dir:
-        command_args.extend(['-d', build_dir])
-    if quiet:
-        command_args.append('-q')
-    if force:
-        command_args.append('-f')
-    if tool:
-        command_args.extend(['-t', tool])
-    if tool_path:
-        command_args.extend(['-p', tool_path])
-    if tool_data:
-        command_args.extend(['-D', tool_data])
-    if if_tool_available:
-        command_args.append('--if-tool-available')
-    if bin:
-        command_args.append('--bin')
-    if no_bin:
-        command_args.append('--no-bin')
-    if sbin:
-        command_args.extend(['-B', sbin])
-    if hex:
-        command_args.append('--hex')
-    if no_hex:
-        command_args.append('--no-hex')
-    if shex:
-        command_args.extend(['-H', shex])
+    conflict = _find_conflict(_SIGN_CONFLICTS, locals())
+    if conflict:
+        return conflict
+    command_args = _apply_flags(['sign'], _SIGN_FLAGS, locals())
     if tool_opt:
-        command_args.append('--')
-        command_args.extend(tool_opt)
-    return run_west_command(command_args)
+        command_args += ('--', *tool_opt)
+    return await run_west_command(command_args)
 
 # --- MCP Tool for `west spdx` ---
-@mcp.tool()
-def create_spdx_bom(
+_SPDX_FLAGS = (
+    ('-i', 'init', 'bool'),
+    ('-d', 'build_dir', 'val'),
+    ('-n', 'namespace_prefix', 'val'),
+    ('-s', 'spdx_dir', 'val'),
+    ('--spdx-version', 'spdx_version', 'val'),
+    ('--analyze-includes', 'analyze_includes', 'bool'),
+    ('--include-sdk', 'include_sdk', 'bool'),
+)
+
+@_west_tool()
+async def create_spdx_bom(
     init: bool = False,
     build_dir: Optional[str] = None,
     namespace_prefix: Optional[str] = None,
@@ -1354,26 +2535,12 @@ def create_spdx_bom(
     """
     Creates an SPDX bill of materials.
     """
-    command_args = ['spdx']
-    if init:
-        command_args.append('-i')
-    if build_dir:
-        command_args.extend(['-d', build_dir])
-    if namespace_prefix:
-        command_args.extend(['-n', namespace_prefix])
-    if spdx_dir:
-        command_args.extend(['-s', spdx_dir])
-    if spdx_version:
-        command_args.extend(['--spdx-version', spdx_version])
-    if analyze_includes:
-        command_args.append('--analyze-includes')
-    if include_sdk:
-        command_args.append('--include-sdk')
-    return run_west_command(command_args)
+    command_args = _apply_flags(['spdx'], _SPDX_FLAGS, locals())
+    return await run_west_command(command_args)
 
 # --- MCP Tool for `west sdk` ---
-@mcp.tool()
-def manage_sdk(
+@_west_tool()
+async def manage_sdk(
     subcommand: str,
     args: Optional[List[str]] = None,
 ) -> Dict[str, Any]:
@@ -1383,72 +2550,82 @@ def manage_sdk(
     command_args = ['sdk', subcommand]
     if args:
         command_args.extend(args)
-    return run_west_command(command_args)
+    return await run_west_command(command_args)
 
 
 
-# --- NEW MCP Tool for listing all available west commands ---
-@mcp.tool()
-def list_west_commands() -> Dict[str, Any]:
+# --- Helper for parsing `west --help` ---
+# How the section headers in 'west --help' output start (lowercased), mapped
+# to the result key their commands go to. west prints e.g. "built-in commands
+# for managing git repositories:", "other built-in commands:" and "extension
+# commands from project zephyr (path: zephyr):".
+_HELP_SECTIONS = (
+    ("built-in commands", "built_in"),
+    ("other built-in commands", "built_in"),
+    ("extension commands", "extension"),
+)
+
+async def _parse_west_help() -> Dict[str, Any]:
     """
-    Lists all available west commands (built-in and extension) by parsing 'west --help' output.
+    Runs 'west --help' and parses the built-in and extension command names.
+
+    The 'west --help' output itself is memoized by run_west_command like any
+    read-only command, so it is rerun once the workspace (and with it the
+    set of extension commands) may have changed.
 
     Returns:
-        dict: A dictionary containing 'success' (boolean), 'message' (string),
-              and 'commands' (dict with 'built_in' and 'extension' lists of command names).
+        dict: The 'list_west_commands' result.
     """
-    help_result = run_west_command(['--help'])
+    help_result = await run_west_command(['--help'])
 
-    if not help_result['success']:
+    if not help_result.success:
         return {
             "success": False,
             "message": "Failed to retrieve west help output.",
             "commands": {"built_in": [], "extension": []},
-            "stdout": help_result.get('stdout', ''),
-            "stderr": help_result.get('stderr', '')
+            "stdout": help_result.stdout,
+            "stderr": help_result.stderr
         }
 
-    output_lines = help_result['stdout'].splitlines()
-    built_in_commands = []
-    extension_commands = []
-    current_section = None
-
-    for line in output_lines:
-        line = line.strip()
-        if line == "Built-in commands:":
-            current_section = "built_in"
-            continue
-        elif line == "Extension Commands:":
-            current_section = "extension"
-            continue
-        elif not line and current_section: # Empty line often indicates end of section
-            current_section = None
-            continue
-
-        if current_section:
-            # Commands are typically listed as 'command_name: one-line description'
-            match = re.match(r'^(\S+)(?:\s+.*)?$', line)
-            if match:
-                command_name = match.group(1).strip()
-                if current_section == "built_in":
-                    built_in_commands.append(command_name)
-                elif current_section == "extension":
-                    extension_commands.append(command_name)
+    commands = {"built_in": [], "extension": []}
+    current = None # The list the current section's commands go to
+
+    for line in help_result.stdout.splitlines():
+        if not line.strip():
+            current = None # An empty line ends a section
+        elif not line[0].isspace():
+            header = line.lower()
+            current = next((commands[key] for prefix, key in _HELP_SECTIONS if header.startswith(prefix)), None)
+            if current is None and (commands["built_in"] or commands["extension"]):
+                break # The epilog after the command lists
+        elif current is not None and not line[2:3].isspace():
+            # Commands are listed as '  command_name: one-line description';
+            # lines indented further continue a long description.
+            current.append(line.split(None, 1)[0].rstrip(':'))
 
     return {
         "success": True,
         "message": "Successfully listed west commands.",
-        "commands": {
-            "built_in": built_in_commands,
-            "extension": extension_commands
-        },
-        "stdout": help_result.get('stdout', ''),
-        "stderr": help_result.get('stderr', '')
+        "commands": commands,
+        "stdout": help_result.stdout,
+        "stderr": help_result.stderr
     }
 
+# --- NEW MCP Tool for listing all available west commands ---
+@_west_tool()
+async def list_west_commands() -> Dict[str, Any]:
+    """
+    Lists all available west commands (built-in and extension) by parsing 'west --help' output.
+
+    Returns:
+        dict: A dictionary containing 'success' (boolean), 'message' (string),
+              and 'commands' (dict with 'built_in' and 'extension' lists of command names).
+    """
+    return await _parse_west_help()
+
 # --- NEW MCP Tool for running arbitrary west commands (fallback) ---
-@mcp.tool()
-def run_arbitrary_west_command(command_name: str, args: Optional[List[str]] = None) -> Dict[str, Any]:
+@_west_tool()
+async def run_arbitrary_west_command(command_name: str, args: Optional[List[str]] = None) -> Dict[str, Any]:
     """
     Executes any west command by its name with a list of arguments.
     This tool serves as a generic fallback for commands that do not have
@@ -1461,13 +2638,32 @@ def run_arbitrary_west_command(command_name: str, args: Optional[List[str]] = No
     Returns:
         dict: Command execution result.
     """
-    full_args = [command_name]
-    if args:
-        full_args.extend(args)
-    return run_west_command(full_args)
-
+    return await run_west_command([command_name, *args] if args else [command_name])
+
+# --- Prefetching at startup ---
+# Clients typically start by listing the available commands and the
+# configuration. Those commands are run while the server starts, which leaves
+# their results in the run_west_command memo with the usual lifetimes.
+_PREFETCH_COMMANDS = (('config', '-l'), ('sdk', 'list'))
+
+async def _prefetch() -> None:
+    """Fetches list_west_commands' result, then those _PREFETCH_COMMANDS west has, concurrently."""
+    if _WEST_BIN is None:
+        return
+    commands = (await list_west_commands()).get('commands') or {}
+    available = set(commands.get('built_in', ())) | set(commands.get('extension', ()))
+    await asyncio.gather(
+        *(run_west_command(list(command_args)) for command_args in _PREFETCH_COMMANDS
+          if command_args[0] in available),
+        return_exceptions=True
+    )
 
 # --- Main Execution Block ---
 if __name__ == '__main__':
     logger.info("Starting West MCP Server...")
+    if _WEST_BIN is None:
+        logger.warning("'west' not found in PATH; west commands will fail until the server is restarted.")
+    elif not getattr(subprocess, '_USE_POSIX_SPAWN', False):
+        # Only Linux (glibc 2.24+) and macOS get posix_spawn(); see _SPAWN_KWARGS.
+        logger.info("posix_spawn() is unavailable; west commands are started with fork() and exec().")
     mcp.run()
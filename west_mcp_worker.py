@@ -0,0 +1,94 @@
+"""
+Persistent helper process for west_mcp_server.py.
+
+Starting west means starting a Python interpreter, importing west and loading
+its extension commands, which costs far more than the actual work of quick
+commands like 'west topdir' or 'west boards'. The server therefore keeps a
+few of these workers running: each imports west once and then runs each
+requested command in-process.
+
+Protocol (one JSON object per line):
+    stdout, on startup:  {"ready": true}
+    stdin, per command:  {"argv": ["boards", "-n", "nrf"]}
+    stdout, per command: {"rc": 0, "stdout": "...", "stderr": "..."}
+
+Output is captured at the file descriptor level, so anything the command's own
+child processes (git, cmake, ...) print is captured too. Non-UTF-8 bytes are
+carried as surrogate escapes.
+"""
+import json
+import os
+import sys
+import tempfile
+import traceback
+
+from west.app import main as west_main
+
+
+def _run(argv):
+    """
+    Runs one west command, capturing everything written to fds 1 and 2.
+
+    Args:
+        argv (list): The west command and its arguments.
+
+    Returns:
+        tuple: (exit code, stdout bytes, stderr bytes).
+    """
+    sys.stdout.flush()
+    sys.stderr.flush()
+    saved_out, saved_err = os.dup(1), os.dup(2)
+    with tempfile.TemporaryFile() as out, tempfile.TemporaryFile() as err:
+        os.dup2(out.fileno(), 1)
+        os.dup2(err.fileno(), 2)
+        try:
+            west_main.main(argv)
+            rc = 0
+        except SystemExit as e:
+            if e.code is None or isinstance(e.code, int):
+                rc = e.code or 0
+            else:
+                print(e.code, file=sys.stderr)
+                rc = 1
+        except Exception:
+            traceback.print_exc()
+            rc = 1
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os.dup2(saved_out, 1)
+            os.dup2(saved_err, 2)
+            os.close(saved_out)
+            os.close(saved_err)
+        out.seek(0)
+        err.seek(0)
+        return rc, out.read(), err.read()
+
+
+def main():
+    # Keep private copies of the protocol pipes, then point fds 0 and 1 at
+    # /dev/null so neither west nor its children can read requests or write
+    # into the reply stream.
+    requests = os.fdopen(os.dup(0), 'r', encoding='utf-8')
+    replies = os.fdopen(os.dup(1), 'w', encoding='utf-8')
+    devnull = os.open(os.devnull, os.O_RDWR)
+    os.dup2(devnull, 0)
+    os.dup2(devnull, 1)
+    os.close(devnull)
+
+    replies.write(json.dumps({"ready": True}) + "\n")
+    replies.flush()
+
+    for line in requests:
+        argv = json.loads(line)["argv"]
+        rc, stdout, stderr = _run(argv)
+        replies.write(json.dumps({
+            "rc": rc,
+            "stdout": stdout.decode('utf-8', 'surrogateescape'),
+            "stderr": stderr.decode('utf-8', 'surrogateescape'),
+        }) + "\n")
+        replies.flush()
+
+
+if __name__ == '__main__':
+    main()